@@ -1,57 +1,551 @@
 """Flask application for triangulation service."""
 
+import contextlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 import requests
-from flask import Flask, Response, jsonify
+from flask import Flask, Response, g, jsonify, request
+from werkzeug.wsgi import wrap_file
 
+import TP.Code.pipeline as pipeline
 import TP.Code.serializers as serializers
-import TP.Code.triangulation as triangulation
+from TP.Code.cache import DiskResultStore, MeshStore, ResultCache, SingleFlight, content_hasher
+from TP.Code.executor import TriangulationExecutor
+from TP.Code.metrics import ServiceMetrics
+from TP.Code.triangulation import Triangulation
+from TP.Code.upstream import PointSetClient
 
 app = Flask(__name__)
 
-POINT_SET_MANAGER_URL = "http://localhost:5001/pointsets"
+# Client partagé vers le PointSetManager, configuré par les variables POINT_SET_MANAGER_*
+pointset_client = PointSetClient.from_env()
+POINT_SET_MANAGER_URL = pointset_client.base_url
+
+# Triangulation dans le thread de la requête ou dans un pool de processus (TRIANGULATION_EXECUTOR)
+triangulation_executor = TriangulationExecutor.from_env()
+
+# Réponses déjà sérialisées, indexées par l'empreinte du PointSet reçu
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES)
+
+# Cache sur disque partagé entre processus et redémarrages (RESULT_STORE_DIR) ; s'il est configuré,
+# /triangulate l'utilise à la place de result_cache
+result_store = DiskResultStore.from_env()
+
+# Métriques exposées sur /metrics
+service_metrics = ServiceMetrics()
+
+# Requêtes identiques simultanées : un seul téléchargement par identifiant, une seule triangulation par contenu
+fetch_flights = SingleFlight()
+triangulate_flights = SingleFlight()
+
+# Dernière version reçue de chaque PointSet, (ETag amont, contenu, empreinte), pour les requêtes conditionnelles
+UPSTREAM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+upstream_versions = ResultCache(UPSTREAM_CACHE_MAX_BYTES)
+
+# Taille des morceaux lus sur la réponse du PointSetManager ou sur le corps de la requête
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Taille maximale d'un PointSet envoyé dans le corps de POST /triangulate/<pointset_id> (4 millions de points)
+MAX_INLINE_BYTES = 4 + 16 * 4_000_000
+
+def _parse_stream(chunks, length=None, max_bytes=None):
+    """Décode en flux le PointSet formé par les morceaux chunks et renvoie (contenu, empreinte).
+
+    Le PointSet est décodé et haché au fil de la réception, dans un tampon
+    unique : un en-tête incompatible avec la taille annoncée length est refusé
+    avant de lire la suite. Lève PipelineError : 400 si le corps est invalide
+    ou tronqué, 413 s'il dépasse max_bytes (taille annoncée, points annoncés
+    ou octets reçus, vérifiés dans cet ordre).
+    """
+    too_large = pipeline.PipelineError(413, {"error": "PointSet too large", "details": f"at most {max_bytes} bytes"})
+    if max_bytes is not None and length is not None and length > max_bytes:
+        raise too_large
+    parser = serializers.PointSetParser(length)
+    hasher = content_hasher()
+    received = 0
+    try:
+        for chunk in chunks:
+            received += len(chunk)
+            parser.feed(chunk)
+            if max_bytes is not None and (received > max_bytes or (parser.nbr_point or 0) * 16 + 4 > max_bytes):
+                raise too_large
+            hasher.update(chunk)
+        parser.close()
+    except ValueError as e:
+        raise pipeline.PipelineError(400, {"error": "Invalid PointSet format", "details": str(e)}) from e
+    return parser.data, hasher.hexdigest()
+
+def _download(pointset_id):
+    """Récupère le PointSet pointset_id et renvoie (réponse, contenu, empreinte du contenu).
+
+    Si une version avec ETag est connue, la requête porte If-None-Match et
+    une réponse 304 réutilise le contenu et l'empreinte déjà calculés. Le
+    contenu et l'empreinte valent None si la réponse n'est pas un succès.
+    Le corps est lu en flux (voir _parse_stream).
+    """
+    known = upstream_versions.get(pointset_id)
+    headers = {"If-None-Match": known[0]} if known is not None else None
+    response = pointset_client.get_pointset(pointset_id, headers=headers, stream=True)
+    try:
+        if response.status_code == 304 and known is not None:
+            return response, known[1], known[2]
+        if response.status_code != 200:
+            return response, None, None
+        # Content-Length ne donne la taille décodée que si le corps n'est pas compressé (iter_content décompresse)
+        length = response.headers.get("Content-Length")
+        if response.headers.get("Content-Encoding", "identity").lower() != "identity":
+            length = None
+        raw, digest = _parse_stream(response.iter_content(DOWNLOAD_CHUNK_SIZE), int(length) if length else None)
+    finally:
+        response.close()
+    etag = response.headers.get("ETag")
+    if etag:
+        upstream_versions.put(pointset_id, (etag, raw, digest), size=len(raw))
+    return response, raw, digest
+
+def _fetch(pointset_id):
+    """Comme _download, en partageant le téléchargement avec les requêtes simultanées pour le même identifiant."""
+    result, shared = fetch_flights.do(pointset_id, _download, pointset_id)
+    if shared:
+        service_metrics.coalesced.inc("fetch")
+    return result
+
+# Version des réponses mises en cache, incluse dans leur clé et leur ETag : à incrémenter dès qu'une
+# modification de la triangulation ou d'un format de réponse change les octets produits pour un même PointSet
+RESULT_VERSION = 1
+
+def _result_key(digest, response_format):
+    """Clé de cache (et ETag) de la réponse au format response_format pour le PointSet d'empreinte digest."""
+    key = f"{digest}.v{RESULT_VERSION}"
+    return key if response_format == "triangles" else f"{key}.{response_format}"
+
+def _encode(response_format, n_triangles, triangles, points):
+    """Prépare la réponse au format response_format et renvoie (taille totale, itérateur de morceaux)."""
+    if response_format == "triangles":
+        return pipeline.encode(n_triangles, triangles, points)
+    return pipeline.encode_compact(n_triangles, triangles, points, response_format == "compact-zlib")
+
+def _file_response(f, mimetype, headers):
+    """Réponse qui transmet le fichier ouvert f (sendfile si le serveur WSGI le permet), sans le charger en mémoire."""
+    headers["Content-Length"] = str(os.fstat(f.fileno()).st_size)
+    return Response(wrap_file(request.environ, f), mimetype=mimetype, status=200, headers=headers, direct_passthrough=True)
+
+def _triangulate(digest, raw, points):
+    """Triangule le PointSet d'empreinte digest, en partageant le calcul avec les requêtes simultanées."""
+    result, shared = triangulate_flights.do(digest, pipeline.triangulate, raw, points, triangulation_executor)
+    if shared:
+        service_metrics.coalesced.inc("triangulate")
+    return result
+
+@app.before_request
+def _start_request():
+    """Compte la requête parmi les requêtes en cours."""
+    g.request_start = time.perf_counter()
+    g.endpoint = request.url_rule.rule if request.url_rule else "unknown"
+    service_metrics.in_flight.inc(g.endpoint)
+
+@app.after_request
+def _finish_request(response):
+    """Compte le code de réponse, puis mesure la durée une fois la réponse entièrement envoyée."""
+    start, endpoint = g.request_start, g.endpoint
+    service_metrics.responses.inc(endpoint, str(response.status_code))
+
+    def done():
+        service_metrics.in_flight.dec(endpoint)
+        service_metrics.request_seconds.observe(time.perf_counter() - start, endpoint)
+
+    response.call_on_close(done)
+    return response
+
+def _cache_when_complete(chunks, key):
+    """Transmet les morceaux de la réponse et la met en cache une fois entièrement envoyée.
+
+    La copie est abandonnée dès qu'elle dépasse la taille du cache, pour ne pas
+    garder en mémoire une réponse qui ne pourrait pas être stockée.
+    """
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size <= result_cache.max_bytes:
+                parts.append(chunk)
+            else:
+                parts = None
+        yield chunk
+    if parts is not None:
+        result_cache.put(key, b"".join(parts))
+
+def _write_to_store(chunks, key):
+    """Écrit tous les morceaux de la réponse dans result_store et renvoie True si l'entrée a été publiée.
+
+    Une erreur du disque (plein, droits) ou une entrée trop grande pour le
+    cache abandonne l'entrée et renvoie False.
+    """
+    try:
+        pending = result_store.writer(key)
+    except OSError:
+        return False
+    try:
+        for chunk in chunks:
+            pending.write(chunk)
+        return pending.commit()
+    except OSError:
+        pending.abort()
+        return False
+    except BaseException:
+        pending.abort()
+        raise
+
+# Formats de réponse de /triangulate : nom accepté par ?format= -> type MIME accepté dans Accept
+RESPONSE_FORMATS = {
+    "triangles": "application/octet-stream",
+    "compact": "application/vnd.triangulation.compact",
+    "compact-zlib": "application/vnd.triangulation.compact+zlib",
+}
+
+def _response_format():
+    """Renvoie le nom du format demandé par ?format=, sinon par l'en-tête Accept, ou None si ?format= est inconnu.
+
+    Sans préférence exprimée, le format par défaut reste triangles_to_bytes.
+    """
+    name = request.args.get("format")
+    if name is not None:
+        return name if name in RESPONSE_FORMATS else None
+    mimetype = request.accept_mimetypes.best_match(list(RESPONSE_FORMATS.values()), default=RESPONSE_FORMATS["triangles"])
+    return next(name for name, value in RESPONSE_FORMATS.items() if value == mimetype)
 
 @app.route('/triangulate/<pointset_id>', methods=['GET', 'POST'])
 def triangulate_endpoint(pointset_id):
-    """Endpoint pour trianguler un PointSet donné par son ID."""
+    """Endpoint pour trianguler un PointSet donné par son ID.
+
+    Le format de réponse se choisit avec ?format= ou l'en-tête Accept (voir
+    RESPONSE_FORMATS) : triangles_to_bytes par défaut, ou le format compact de
+    serializers.triangles_to_compact, sans les points et éventuellement
+    compressé, pour les clients qui ont déjà le PointSet.
+
+    En POST avec un corps application/octet-stream (format bytes_to_pointset),
+    c'est ce PointSet qui est triangulé, sans passer par le PointSetManager :
+    sa taille est limitée à MAX_INLINE_BYTES (413 au-delà, vérifié avant de
+    lire le corps quand Content-Length est fourni) et les erreurs de format
+    donnent les mêmes codes.
+
+    Sinon, le PointSet est redemandé au PointSetManager avec If-None-Match
+    quand son ETag est connu. La réponse porte un ETag fort tiré du contenu
+    du PointSet, du format et de RESULT_VERSION : un client qui le renvoie dans If-None-Match
+    reçoit 304 en GET, 412 en POST, sans corps ni triangulation.
+
+    La durée de chaque phase (fetch ou receive, cache, parse, triangulate, serialize) est
+    renvoyée dans l'en-tête Server-Timing et alimente l'histogramme de
+    /metrics. La réponse étant envoyée en flux, l'en-tête ne couvre que la
+    préparation de la sérialisation ; l'histogramme reçoit la durée complète.
+    """
+    response_format = _response_format()
+    if response_format is None:
+        details = f"expected one of {', '.join(RESPONSE_FORMATS)}"
+        return jsonify({"error": "Unknown response format", "details": details}), 400
+    mimetype = RESPONSE_FORMATS[response_format]
+
+    timer = service_metrics.timer()
+    if request.method == "POST" and request.mimetype == "application/octet-stream":
+        # PointSet fourni dans le corps : pas d'aller-retour vers le PointSetManager
+        try:
+            with timer.phase("receive"):
+                stream = iter(lambda: request.stream.read(DOWNLOAD_CHUNK_SIZE), b"")
+                raw, digest = _parse_stream(stream, request.content_length, MAX_INLINE_BYTES)
+        except pipeline.PipelineError as e:
+            return jsonify(e.body), e.status, {"Server-Timing": timer.header()}
+    else:
+        try:
+            with timer.phase("fetch"):
+                response, raw, digest = _fetch(pointset_id)
+            if response.status_code == 404:
+                return jsonify({"error": "PointSet not found"}), 404, {"Server-Timing": timer.header()}
+            response.raise_for_status()
+            if raw is None:
+                raise requests.exceptions.HTTPError(f"Unexpected status {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            return jsonify({"error": "External service unavailable", "details": str(e)}), 503, {"Server-Timing": timer.header()}
+        except pipeline.PipelineError as e:
+            return jsonify(e.body), e.status, {"Server-Timing": timer.header()}
+
+    # La réponse ne dépend que du contenu et du format : l'ETag en découle, et le client peut garder la sienne
+    key = _result_key(digest, response_format)
+    etag = f'"{key}"'
+    if request.if_none_match.contains_weak(key):
+        headers = {"ETag": etag, "Vary": "Accept", "Server-Timing": timer.header()}
+        if request.method in ("GET", "HEAD"):
+            return Response(status=304, headers=headers)
+        # Hors GET et HEAD, une condition If-None-Match non remplie donne 412 (RFC 9110, section 13.1.2)
+        return jsonify({"error": "Precondition failed", "details": "If-None-Match matches the result"}), 412, headers
+
+    # Réponse déjà calculée pour ce contenu : ni triangulation ni sérialisation
+    lock = None
+    with timer.phase("cache"):
+        cached = result_store.open(key) if result_store is not None else result_cache.get(key)
+        if cached is None and result_store is not None:
+            # Un autre processus calcule peut-être cette réponse : attendre qu'il la publie, puis relire
+            with contextlib.suppress(TimeoutError):
+                lock = result_store.lock(key)
+            cached = result_store.open(key)
+            if cached is not None and lock is not None:
+                lock.release()
+    if cached is not None:
+        headers = {"X-Cache": "HIT", "Server-Timing": timer.header(), "Vary": "Accept", "ETag": etag}
+        if result_store is None:
+            return Response(cached, mimetype=mimetype, status=200, headers=headers)
+        return _file_response(cached, mimetype, headers)
+
+    # 2. Désérialisation, 3. triangulation, 4. sérialisation de la réponse, envoyée par morceaux
+    try:
+        with timer.phase("parse"):
+            points = pipeline.parse(raw)
+        service_metrics.input_points.observe(len(points))
+        with timer.phase("triangulate"):
+            n_triangles, result = _triangulate(digest, raw, points)
+        if result_store is not None:
+            # L'entrée est écrite entièrement et publiée avant l'envoi : le verrou ne dépend pas du client
+            with timer.phase("serialize"):
+                _, chunks = _encode(response_format, n_triangles, result, points)
+                stored = _write_to_store(chunks, key)
+            if lock is not None:
+                lock.release()
+                lock = None
+            cached = result_store.open(key, count=False) if stored else None
+            if cached is not None:
+                headers = {"X-Cache": "MISS", "Server-Timing": timer.header(), "Vary": "Accept", "ETag": etag}
+                return _file_response(cached, mimetype, headers)
+            # Entrée non stockée (trop grande, disque plein) : la réponse est envoyée en flux sans cache
+        with timer.phase("serialize", observe=False):
+            size, chunks = _encode(response_format, n_triangles, result, points)
+    except pipeline.PipelineError as e:
+        return jsonify(e.body), e.status, {"Server-Timing": timer.header()}
+    finally:
+        if lock is not None:
+            lock.release()
+
+    chunks = timer.stream(chunks, "serialize")
+    return Response(
+        _cache_when_complete(chunks, key) if result_store is None else chunks,
+        mimetype=mimetype,
+        status=200,
+        headers={
+            "Content-Length": str(size), "X-Cache": "MISS", "Server-Timing": timer.header(), "Vary": "Accept", "ETag": etag,
+        },
+    )
+
+# Lots : nombre maximal d'identifiants par requête et de PointSets traités en parallèle
+MAX_BATCH_SIZE = 1000
+BATCH_CONCURRENCY = 16
+_batch_pool = ThreadPoolExecutor(BATCH_CONCURRENCY, thread_name_prefix="batch")
+
+def _batch_item(pointset_id):
+    """Traite un PointSet d'un lot et renvoie (status, corps) sans jamais lever d'exception.
+
+    Mêmes étapes et mêmes codes que /triangulate/<pointset_id> ; le corps est
+    le binaire triangles_to_bytes en cas de succès, l'erreur JSON sinon.
+    """
     try:
-        response = requests.get(f"{POINT_SET_MANAGER_URL}/{pointset_id}")
+        response, raw, digest = _fetch(pointset_id)
         if response.status_code == 404:
-            return jsonify({"error": "PointSet not found"}), 404
+            return 404, json.dumps({"error": "PointSet not found"}).encode()
         response.raise_for_status()
+        if raw is None:
+            raise requests.exceptions.HTTPError(f"Unexpected status {response.status_code}")
     except requests.exceptions.RequestException as e:
-        return jsonify({"error": "External service unavailable", "details": str(e)}), 503
+        return 503, json.dumps({"error": "External service unavailable", "details": str(e)}).encode()
+    except pipeline.PipelineError as e:
+        return e.status, json.dumps(e.body).encode()
+    except Exception:
+        # Les en-têtes du lot sont peut-être déjà partis : une exception tronquerait la réponse
+        return 500, json.dumps({"error": "Internal error"}).encode()
 
-    # 2. Désérialisation
+    key = _result_key(digest, "triangles")
+    cached = result_cache.get(key)
+    if cached is not None:
+        return 200, cached
     try:
-        # { changed code }
-        data = serializers.bytes_to_pointset(response.content)
-        points = data["points"]
-    except ValueError as e:
-        return jsonify({"error": "Invalid PointSet format", "details": str(e)}), 400
+        points = pipeline.parse(raw)
+        n_triangles, result = _triangulate(digest, raw, points)
+        _, chunks = pipeline.encode(n_triangles, result, points)
+        body = b"".join(chunks)
+    except pipeline.PipelineError as e:
+        return e.status, json.dumps(e.body).encode()
     except Exception:
-        return jsonify({"error": "Malformed data"}), 422
+        return 500, json.dumps({"error": "Serialization failed"}).encode()
+    result_cache.put(key, body)
+    return 200, body
+
+def _batch_results(ids):
+    """Produit les (status, corps) des éléments du lot, dans l'ordre de ids.
 
-    # 3. Triangulation
+    Au plus BATCH_CONCURRENCY éléments sont soumis en avance sur celui en
+    cours d'envoi : la mémoire occupée par les corps reste bornée quelle que
+    soit la taille du lot. Si l'envoi est interrompu, les éléments pas encore
+    commencés sont annulés.
+    """
+    remaining = iter(ids)
+    pending = deque(_batch_pool.submit(_batch_item, pointset_id) for pointset_id in islice(remaining, BATCH_CONCURRENCY))
     try:
-        # { changed code }
-        result = triangulation.triangulate(points)
-    except ValueError as e:
-        return jsonify({"error": str(e)}), 422
-    except Exception as e:
-        return jsonify({"error": "Triangulation failed", "details": str(e)}), 500
-
-    # 4. Sérialisation de la réponse
-    try:
-        # { changed code }
-        response_bytes = serializers.triangles_to_bytes(
-            len(result),
-            result,
-            len(points),
-            points
-        )
-        return Response(response_bytes, mimetype='application/octet-stream', status=200)
-    except Exception:
-        return jsonify({"error": "Serialization failed"}), 500
+        while pending:
+            result = pending.popleft().result()
+            pointset_id = next(remaining, None)
+            if pointset_id is not None:
+                pending.append(_batch_pool.submit(_batch_item, pointset_id))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+@app.route('/batch/triangulate', methods=['POST'])
+def batch_triangulate_endpoint():
+    """Endpoint pour trianguler plusieurs PointSets en une requête.
+
+    Corps JSON : {"pointset_ids": ["id1", "id2", ...]}. Les PointSets sont
+    récupérés et triangulés en parallèle, par fenêtre de BATCH_CONCURRENCY
+    éléments (voir _batch_results) ; la réponse (voir
+    serializers.iter_batch_bytes) contient un statut par élément, dans l'ordre
+    de la requête, si bien qu'un PointSet en erreur ne fait pas échouer le lot.
+    Pour répartir la triangulation sur plusieurs cœurs, utiliser
+    TRIANGULATION_EXECUTOR=process.
+    """
+    body = request.get_json(silent=True)
+    ids = body.get("pointset_ids") if isinstance(body, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(i, str) and i for i in ids):
+        return jsonify({"error": "Invalid batch request", "details": "expected {\"pointset_ids\": [string, ...]}"}), 400
+    if len(ids) > MAX_BATCH_SIZE:
+        return jsonify({"error": "Batch too large", "details": f"at most {MAX_BATCH_SIZE} pointset ids"}), 400
+
+    return Response(
+        serializers.iter_batch_bytes(len(ids), _batch_results(ids)),
+        mimetype='application/octet-stream',
+        status=200,
+    )
+
+# Triangulations gardées en mémoire pour les insertions incrémentales, bornées en nombre et en octets :
+# le maillage occupe environ 240 octets par point (mesuré avec tracemalloc sur 20 000 points)
+MAX_MESHES = 16
+MESH_STORE_MAX_BYTES = 256 * 1024 * 1024
+MESH_BYTES_PER_POINT = 240
+mesh_store = MeshStore(MAX_MESHES, MESH_STORE_MAX_BYTES)
+
+@app.route('/triangulate/<pointset_id>/points', methods=['POST'])
+def insert_points_endpoint(pointset_id):
+    """Endpoint pour ajouter des points à la triangulation conservée d'un PointSet.
+
+    Le corps (application/octet-stream) est un PointSet ne contenant que les
+    nouveaux points, limité comme les PointSets envoyés à /triangulate à
+    MAX_INLINE_BYTES (413 au-delà). À la première requête pour un
+    identifiant, le PointSet est récupéré et triangulé ; les suivantes ne font
+    qu'insérer les points dans le maillage gardé en mémoire (voir MAX_MESHES).
+
+    Le PointSet est revalidé à chaque requête : avec un ETag amont, c'est une
+    requête conditionnelle (304) ; sans ETag, il est re-téléchargé et son
+    empreinte comparée, pour un coût proportionnel à sa taille. S'il a changé
+    en amont et ne fait qu'ajouter des points au maillage, ces points sont
+    insérés avec ceux de la requête, et les points de la requête déjà
+    présents en amont sont ignorés : un producteur qui ajoute ses points en
+    amont puis les envoie ici ne reçoit pas 422. Sinon (points retirés en
+    amont), le maillage est reconstruit à partir de la nouvelle version. Sans
+    maillage conservé, un point de la requête déjà présent en amont reste un
+    doublon (422).
+
+    Le maillage conservé n'est qu'une accélération propre au processus : il
+    peut être évincé (MAX_MESHES, MESH_STORE_MAX_BYTES) ou absent du processus
+    qui reçoit la requête suivante, et les points qui ne sont pas en amont
+    sont alors perdus. Seul le PointSet du PointSetManager fait foi.
+
+    Avec ?delta=1, la réponse est serializers.delta_to_bytes (triangles
+    retirés puis ajoutés ; tous les triangles après une reconstruction),
+    sinon le maillage complet au format triangles_to_bytes.
+    """
+    try:
+        stream = iter(lambda: request.stream.read(DOWNLOAD_CHUNK_SIZE), b"")
+        raw, _ = _parse_stream(stream, request.content_length, MAX_INLINE_BYTES)
+        new_points = pipeline.parse(raw)
+    except pipeline.PipelineError as e:
+        return jsonify(e.body), e.status
+
+    entry = mesh_store.entry(pointset_id)
+    with entry.lock:
+        try:
+            response, raw, digest = _fetch(pointset_id)
+            if response.status_code == 404:
+                mesh_store.discard(pointset_id)
+                return jsonify({"error": "PointSet not found"}), 404
+            response.raise_for_status()
+            if raw is None:
+                raise requests.exceptions.HTTPError(f"Unexpected status {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            mesh_store.discard(pointset_id)
+            return jsonify({"error": "External service unavailable", "details": str(e)}), 503
+        except pipeline.PipelineError as e:
+            mesh_store.discard(pointset_id)
+            return jsonify(e.body), e.status
+
+        previous = None
+        if entry.mesh is None or entry.digest != digest:
+            known = entry.mesh
+            try:
+                upstream_points = pipeline.parse(raw)
+                upstream = set(upstream_points)
+                if known is not None and all(p in upstream for p in known.points):
+                    # Points ajoutés en amont : insérés avec ceux de la requête, sans reconstruire
+                    appended = [p for p in upstream_points if p not in known]
+                else:
+                    previous = known.triangles() if known is not None else None
+                    entry.mesh = Triangulation(upstream_points)
+                    entry.digest = digest
+                    appended = []
+            except pipeline.PipelineError as e:
+                mesh_store.discard(pointset_id)
+                return jsonify(e.body), e.status
+            except ValueError as e:
+                mesh_store.discard(pointset_id)
+                return jsonify({"error": str(e)}), 422
+            if known is not None:
+                # Les points de la requête que le PointSet a reçus entre-temps ne sont pas des doublons
+                new_points = appended + [p for p in new_points if p not in upstream]
+
+        mesh = entry.mesh
+        try:
+            removed, added = mesh.insert(new_points)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 422
+        entry.digest = digest
+        mesh_store.resize(pointset_id, entry, len(mesh) * MESH_BYTES_PER_POINT)
+
+        if request.args.get("delta") in ("1", "true"):
+            if previous is not None:
+                # Maillage reconstruit : le delta remplace tous les triangles précédents
+                removed, added = previous, mesh.triangles()
+            body = serializers.delta_to_bytes(removed, added)
+        else:
+            triangles = mesh.triangles()
+            body = serializers.triangles_to_bytes(len(triangles), triangles, len(mesh), mesh.points)
+    return Response(bytes(body), mimetype='application/octet-stream', status=200)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose les métriques du service au format texte de Prometheus."""
+    return Response(service_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats_endpoint():
+    """Expose les compteurs du cache de résultats (hits, misses, evictions, occupation).
+
+    Si le cache sur disque est configuré, ses compteurs sont ajoutés sous la clé "disk".
+    """
+    stats = result_cache.stats()
+    if result_store is not None:
+        stats["disk"] = result_store.stats()
+    return jsonify(stats)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000) # pragma: no cover
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""Variante asynchrone (ASGI) du service de triangulation.
+
+Même contrat que l'application Flask (/triangulate/<pointset_id>, mêmes codes
+d'erreur 404/400/422/503/500), mais l'attente du PointSetManager ne bloque
+aucun thread : de nombreuses requêtes vers un PointSetManager lent peuvent
+être en cours dans un seul processus. Lancement : uvicorn TP.Code.asgi:app
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import TP.Code.pipeline as pipeline
+from TP.Code.executor import TriangulationExecutor
+from TP.Code.upstream import AsyncPointSetClient, UpstreamError
+
+ROUTE_PREFIX = "/triangulate/"
+
+
+async def _send_json(send, status, body):
+    """Envoie une réponse JSON complète."""
+    payload = json.dumps(body).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+class TriangulationApp:
+    """Application ASGI de triangulation.
+
+    Le PointSet est récupéré et décodé en flux par AsyncPointSetClient
+    (httpx) ; la triangulation et la préparation de la réponse, coûteuses en
+    CPU, sont confiées à un pool de threads qui appelle le
+    TriangulationExecutor (en ligne ou pool de processus).
+    """
+
+    def __init__(self, client=None, executor=None, cpu_threads=None):
+        """Crée l'application ; client et executor sont lus dans l'environnement s'ils ne sont pas fournis."""
+        self.client = client or AsyncPointSetClient.from_env()
+        self.executor = executor or TriangulationExecutor.from_env()
+        self._threads = ThreadPoolExecutor(cpu_threads, thread_name_prefix="triangulate")
+
+    async def __call__(self, scope, receive, send):
+        """Point d'entrée ASGI."""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"]
+        pointset_id = path[len(ROUTE_PREFIX):]
+        if not path.startswith(ROUTE_PREFIX) or not pointset_id or "/" in pointset_id:
+            await _send_json(send, 404, {"error": "Not found"})
+        elif scope["method"] not in ("GET", "POST"):
+            await _send_json(send, 405, {"error": "Method not allowed"})
+        else:
+            await self.triangulate(pointset_id, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.client.aclose()
+                self.executor.shutdown()
+                self._threads.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def triangulate(self, pointset_id, send):
+        """Traite /triangulate/<pointset_id> et envoie la réponse."""
+        # 1. Récupération du PointSet sans bloquer la boucle d'événements
+        try:
+            status, raw = await self.client.get_pointset(pointset_id)
+        except UpstreamError as e:
+            await _send_json(send, 503, {"error": "External service unavailable", "details": str(e)})
+            return
+        except ValueError as e:
+            # Corps décodé en flux par le client : mêmes code et message que pipeline.parse
+            await _send_json(send, 400, {"error": "Invalid PointSet format", "details": str(e)})
+            return
+        if status == 404:
+            await _send_json(send, 404, {"error": "PointSet not found"})
+            return
+        if status >= 400:
+            await _send_json(send, 503, {"error": "External service unavailable", "details": f"HTTP {status}"})
+            return
+
+        # 2. Désérialisation, 3. triangulation et 4. sérialisation hors de la boucle d'événements
+        loop = asyncio.get_running_loop()
+        try:
+            points = pipeline.parse(raw)
+            n_triangles, result = await loop.run_in_executor(self._threads, pipeline.triangulate, raw, points, self.executor)
+            size, chunks = await loop.run_in_executor(self._threads, pipeline.encode, n_triangles, result, points)
+        except pipeline.PipelineError as e:
+            await _send_json(send, e.status, e.body)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/octet-stream"), (b"content-length", str(size).encode())],
+        })
+        # Chaque morceau est produit dans le pool de threads : la sérialisation ne bloque pas la boucle
+        while (chunk := await loop.run_in_executor(self._threads, next, chunks, None)) is not None:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+
+app = TriangulationApp()
@@ -0,0 +1,270 @@
+"""Banc de mesure de la triangulation et des conversions binaires, avec référence JSON.
+
+Pour chaque distribution de points et chaque taille, trois phases sont
+mesurées séparément : bytes_to_pointset, triangulate et triangles_to_bytes.
+Chaque mesure est précédée de tours d'échauffement puis répétée ; on rapporte
+la médiane, le 95e centile et le pic mémoire (tracemalloc, sur un tour à part
+pour ne pas fausser les temps).
+
+Les résultats, échantillons compris, peuvent être enregistrés en JSON et
+servir de référence : une phase est déclarée en régression si sa médiane
+dépasse celle de la référence d'au moins --threshold et que le test de
+Mann-Whitney (unilatéral, exact) est significatif au seuil --alpha. Le code de
+sortie vaut alors 1. Avec 5 répétitions de part et d'autre, la plus petite
+p-valeur atteignable est 1/252 ; avec 4, elle vaut 1/70 et le seuil de 1 % est
+inatteignable : la comparaison est alors refusée plutôt que de ne jamais rien signaler.
+
+Exemple : python -m TP.Code.bench --sizes 1000,10000 --compare baseline.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import struct
+import sys
+import time
+import tracemalloc
+from functools import cache
+
+from TP.Code.serializers import bytes_to_pointset, triangles_to_bytes
+from TP.Code.triangulation import triangulate
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+FULL_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+PHASES = ("bytes_to_pointset", "triangulate", "triangles_to_bytes")
+
+
+def _uniform(n, rnd):
+    return [(rnd.random(), rnd.random()) for _ in range(n)]
+
+def _clusters(n, rnd):
+    centers = [(rnd.random(), rnd.random()) for _ in range(10)]
+    points = []
+    for _ in range(n):
+        cx, cy = rnd.choice(centers)
+        points.append((rnd.gauss(cx, 0.02), rnd.gauss(cy, 0.02)))
+    return points
+
+def _grid(n, rnd):
+    side = math.isqrt(n - 1) + 1
+    return [(float(i % side), float(i // side)) for i in range(n)]
+
+def _cocircular(n, rnd):
+    step = 2 * math.pi / n
+    return [(math.cos(i * step), math.sin(i * step)) for i in range(n)]
+
+def _near_colinear(n, rnd):
+    return [(i / n, i / n + (rnd.random() - 0.5) * 1e-12) for i in range(n)]
+
+# Distributions disponibles : fonction (n, générateur aléatoire) -> liste de points
+DISTRIBUTIONS = {
+    "uniform": _uniform,
+    "clusters": _clusters,
+    "grid": _grid,
+    "cocircular": _cocircular,
+    "near-colinear": _near_colinear,
+}
+
+
+def generate(distribution, n, seed=0):
+    """Génère n points distincts selon la distribution demandée (reproductible pour un seed donné)."""
+    return list(dict.fromkeys(DISTRIBUTIONS[distribution](n, random.Random(seed))))
+
+
+def percentile(samples, q):
+    """Renvoie le centile q (entre 0 et 100) des échantillons, par la méthode du rang le plus proche."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def median(samples):
+    """Renvoie la médiane des échantillons."""
+    ordered = sorted(samples)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+
+@cache
+def _arrangements(n1, n2, u):
+    """Nombre d'ordres de n1 + n2 valeurs où exactement u paires (x, y) vérifient x > y."""
+    if u < 0:
+        return 0
+    if n1 == 0 or n2 == 0:
+        return 1 if u == 0 else 0
+    # La plus grande valeur vient soit du premier échantillon (elle dépasse les n2 autres), soit du second
+    return _arrangements(n1 - 1, n2, u - n2) + _arrangements(n1, n2 - 1, u)
+
+def mann_whitney_greater(current, baseline):
+    """Renvoie la p-valeur exacte du test de Mann-Whitney unilatéral « current est plus lent que baseline ».
+
+    Les ex aequo comptent pour moitié dans la statistique U, arrondie vers le
+    bas, ce qui rend le test légèrement conservateur.
+    """
+    n1, n2 = len(current), len(baseline)
+    u = sum(1.0 if x > y else 0.5 if x == y else 0.0 for x in current for y in baseline)
+    total = math.comb(n1 + n2, n1)
+    favorable = sum(_arrangements(n1, n2, k) for k in range(math.floor(u), n1 * n2 + 1))
+    return favorable / total
+
+
+def min_p_value(n1, n2):
+    """Renvoie la plus petite p-valeur que mann_whitney_greater peut donner pour n1 et n2 mesures."""
+    return 1 / math.comb(n1 + n2, n1)
+
+
+def _measure(fn, repeat, warmup, memory):
+    """Exécute fn warmup fois sans mesure puis repeat fois, et renvoie les temps et le pic mémoire."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    result = {"samples": samples, "median": median(samples), "p95": percentile(samples, 95)}
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+def run(sizes=DEFAULT_SIZES, distributions=tuple(DISTRIBUTIONS), phases=PHASES, repeat=5, warmup=1, memory=True, log=None):
+    """Lance le banc et renvoie les résultats, indexés par "phase/distribution/taille".
+
+    log, s'il est fourni, est appelé avec le nom et le résultat de chaque mesure
+    dès qu'elle est terminée.
+    """
+    results = {}
+    for distribution in distributions:
+        for size in sizes:
+            points = generate(distribution, size)
+            raw = struct.pack('<I', len(points)) + struct.pack(f'<{2 * len(points)}d', *(c for p in points for c in p))
+            pointset = bytes_to_pointset(raw)["points"]
+            triangles = triangulate(pointset) if {"triangulate", "triangles_to_bytes"} & set(phases) else []
+            cases = {
+                "bytes_to_pointset": lambda raw=raw: bytes_to_pointset(raw),
+                "triangulate": lambda pointset=pointset: triangulate(pointset),
+                "triangles_to_bytes": lambda t=triangles, p=pointset: triangles_to_bytes(len(t), t, len(p), p),
+            }
+            for phase in phases:
+                name = f"{phase}/{distribution}/{size}"
+                results[name] = _measure(cases[phase], repeat, warmup, memory)
+                if log is not None:
+                    log(name, results[name])
+    return results
+
+
+def compare(results, baseline, alpha=0.01, threshold=0.10):
+    """Compare des résultats à une référence et renvoie la liste des régressions.
+
+    Chaque régression est un dictionnaire (name, baseline, current, ratio,
+    p_value). Les mesures absentes de la référence sont ignorées. Lève
+    ValueError si une mesure a trop peu d'échantillons pour que le test
+    puisse être significatif au seuil alpha (voir min_p_value).
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        smallest = min_p_value(len(current["samples"]), len(reference["samples"]))
+        if smallest >= alpha:
+            raise ValueError(f"{name}: {len(current['samples'])} samples against {len(reference['samples'])} "
+                             f"cannot reach alpha={alpha} (smallest p-value {smallest:.4f})")
+        ratio = current["median"] / reference["median"] if reference["median"] else math.inf
+        if ratio <= 1 + threshold:
+            continue
+        p_value = mann_whitney_greater(current["samples"], reference["samples"])
+        if p_value < alpha:
+            regressions.append({
+                "name": name,
+                "baseline": reference["median"],
+                "current": current["median"],
+                "ratio": ratio,
+                "p_value": p_value,
+            })
+    return regressions
+
+
+def save(results, path):
+    """Enregistre les résultats en JSON, avec la description de la machine."""
+    document = {
+        "version": 1,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+
+def load(path):
+    """Relit les résultats enregistrés par save."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def _print_result(name, result):
+    line = f"{name:<45} median {result['median'] * 1000:10.2f} ms   p95 {result['p95'] * 1000:10.2f} ms"
+    if "peak_bytes" in result:
+        line += f"   peak {result['peak_bytes'] / 2**20:8.1f} MiB"
+    print(line, flush=True)
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande ; renvoie 1 si une régression est détectée."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="tailles séparées par des virgules, ou 'full' pour aller jusqu'à 1 million de points")
+    parser.add_argument("--distributions", default=",".join(DISTRIBUTIONS))
+    parser.add_argument("--phases", default=",".join(PHASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="ne pas mesurer le pic mémoire")
+    parser.add_argument("--output", help="fichier JSON où enregistrer les résultats")
+    parser.add_argument("--compare", help="fichier JSON de référence (ignoré s'il n'existe pas)")
+    parser.add_argument("--alpha", type=float, default=0.01, help="seuil de significativité du test")
+    parser.add_argument("--threshold", type=float, default=0.10, help="ralentissement relatif minimal signalé")
+    args = parser.parse_args(argv)
+
+    sizes = FULL_SIZES if args.sizes == "full" else tuple(int(s) for s in args.sizes.split(","))
+    distributions = tuple(args.distributions.split(","))
+    phases = tuple(args.phases.split(","))
+    for value in set(distributions) - set(DISTRIBUTIONS):
+        parser.error(f"unknown distribution: {value}")
+    for value in set(phases) - set(PHASES):
+        parser.error(f"unknown phase: {value}")
+
+    baseline = None
+    if args.compare:
+        try:
+            baseline = load(args.compare)
+        except FileNotFoundError:
+            print(f"No baseline at {args.compare}, nothing to compare against", file=sys.stderr)
+    if baseline is not None:
+        # Vérifié avant de mesurer : avec trop peu de répétitions, aucune régression ne pourrait être signalée
+        names = {f"{phase}/{distribution}/{size}" for phase in phases for distribution in distributions for size in sizes}
+        counts = [len(baseline[name]["samples"]) for name in names & baseline.keys()]
+        if counts and min_p_value(args.repeat, min(counts)) >= args.alpha:
+            parser.error(f"--repeat {args.repeat} against {min(counts)} baseline samples cannot reach "
+                         f"--alpha {args.alpha} (smallest p-value {min_p_value(args.repeat, min(counts)):.4f})")
+
+    results = run(sizes, distributions, phases, args.repeat, args.warmup, not args.no_memory, log=_print_result)
+    if args.output:
+        save(results, args.output)
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.alpha, args.threshold)
+    for r in regressions:
+        print(f"REGRESSION {r['name']}: {r['baseline'] * 1000:.2f} ms -> {r['current'] * 1000:.2f} ms "
+              f"(x{r['ratio']:.2f}, p={r['p_value']:.4f})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main()) # pragma: no cover
@@ -0,0 +1,184 @@
+"""Triangulation hors ligne de fichiers PointSet, pour les reprises de données en masse.
+
+Chaque fichier d'entrée (format bytes_to_pointset) est projeté en mémoire avec
+mmap puis lu sans copie ; les triangles sont écrits au format
+triangles_to_bytes. Les fichiers sont répartis sur un pool de processus
+(executor.TriangulationExecutor), avec délai par fichier et remplacement des
+processus qui meurent.
+
+Chaque résultat est d'abord écrit dans un fichier temporaire puis renommé :
+un fichier de sortie présent est donc toujours complet, et une exécution
+interrompue reprend là où elle s'était arrêtée en sautant les fichiers déjà
+produits (sauf avec --force).
+
+Exemple : python -m TP.Code.bulk donnees/ autre.bin -o sorties/ --workers 8
+"""
+
+import argparse
+import contextlib
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import TP.Code.serializers as serializers
+import TP.Code.triangulation as triangulation
+from TP.Code.executor import TriangulationExecutor
+
+DEFAULT_SUFFIX = ".triangles"
+PROGRESS_INTERVAL = 5.0
+
+
+def _encode(data):
+    """Décode le PointSet data, le triangule et renvoie (nombre de points, nombre de triangles, binaire de sortie)."""
+    points = serializers.bytes_to_pointset(data)["points"]
+    triangles = triangulation.triangulate(points)
+    return len(points), len(triangles), serializers.triangles_to_bytes(len(triangles), triangles, len(points), points)
+
+
+def triangulate_file(src, dst):
+    """Triangule le fichier src et écrit le résultat dans dst ; renvoie (nombre de points, nombre de triangles).
+
+    Tâche exécutée dans un processus de travail. Le fichier est lu via mmap,
+    si bien que seules les pages nécessaires sont chargées et que le PointSet
+    n'est jamais copié en entier.
+    """
+    with open(src, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+    try:
+        n_points, n_triangles, body = _encode(mapped if mapped is not None else b"")
+    finally:
+        if mapped is not None:
+            # Une vue encore référencée (par exemple par une trace d'exception) empêche la fermeture :
+            # la projection sera alors libérée par le ramasse-miettes
+            with contextlib.suppress(BufferError):
+                mapped.close()
+
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    partial = dst.with_name(dst.name + ".part")
+    with open(partial, "wb") as f:
+        f.write(body)
+    os.replace(partial, dst)
+    return n_points, n_triangles
+
+
+def collect(inputs, output_dir, suffix=DEFAULT_SUFFIX, pattern="*"):
+    """Renvoie les couples (fichier d'entrée, fichier de sortie) à traiter.
+
+    Un fichier donné directement produit output_dir/<nom><suffix> ; les fichiers
+    d'un répertoire (parcouru récursivement, filtrés par pattern) gardent leur
+    chemin relatif sous output_dir. Les sorties et fichiers temporaires
+    rencontrés dans les entrées sont ignorés.
+    """
+    output_dir = Path(output_dir)
+    jobs = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            for src in sorted(item.rglob(pattern)):
+                if src.is_file() and not src.name.endswith((suffix, ".part")):
+                    relative = src.relative_to(item)
+                    jobs.append((src, output_dir / relative.with_name(relative.name + suffix)))
+        elif item.is_file():
+            jobs.append((item, output_dir / (item.name + suffix)))
+        else:
+            raise FileNotFoundError(f"No such file or directory: {item}")
+    return jobs
+
+
+class Report:
+    """Compteurs d'avancement et débit (PointSets et points par seconde)."""
+
+    def __init__(self, total):
+        """Démarre le chronomètre pour total fichiers à traiter."""
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.points = 0
+        self.start = time.perf_counter()
+
+    def add(self, n_points):
+        """Compte un fichier triangulé de n_points points."""
+        self.done += 1
+        self.points += n_points
+
+    def line(self):
+        """Résumé de l'avancement et du débit depuis le départ."""
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return (f"{self.done + self.skipped + self.failed}/{self.total} files "
+                f"({self.done} triangulated, {self.skipped} skipped, {self.failed} failed) in {elapsed:.1f}s: "
+                f"{self.done / elapsed:.1f} point sets/s, {self.points / elapsed:.0f} points/s")
+
+
+def run(jobs, workers=None, timeout=None, force=False, progress=PROGRESS_INTERVAL, out=None):
+    """Triangule les couples (entrée, sortie) de jobs et renvoie le Report final.
+
+    Les sorties existantes sont sautées sauf si force est vrai. Un fichier en
+    erreur est signalé sur out (par défaut sys.stderr) sans interrompre les
+    autres.
+    """
+    out = out or sys.stderr
+    report = Report(len(jobs))
+    pending = []
+    for src, dst in jobs:
+        if not force and Path(dst).exists():
+            report.skipped += 1
+        else:
+            pending.append((src, dst))
+
+    executor = TriangulationExecutor(mode="process", workers=workers, timeout=timeout)
+    last = time.perf_counter()
+    # Un thread par processus : chacun attend sa tâche via executor.run (délai et reprise après crash)
+    threads = ThreadPoolExecutor(executor.workers, thread_name_prefix="bulk")
+    try:
+        futures = {threads.submit(executor.run, triangulate_file, str(src), str(dst)): src for src, dst in pending}
+        for future in as_completed(futures):
+            try:
+                n_points, _ = future.result()
+            except Exception as e:
+                report.failed += 1
+                print(f"FAILED {futures[future]}: {e}", file=out)
+            else:
+                report.add(n_points)
+            now = time.perf_counter()
+            if progress and now - last >= progress:
+                print(report.line(), file=out, flush=True)
+                last = now
+    finally:
+        threads.shutdown(wait=False, cancel_futures=True)
+        executor.shutdown()
+    return report
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande ; renvoie 1 si au moins un fichier a échoué."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="fichiers PointSet ou répertoires à parcourir")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut, un par cœur)")
+    parser.add_argument("--timeout", type=float, default=None, help="délai maximal par fichier, en secondes")
+    parser.add_argument("--pattern", default="*", help="motif des fichiers à prendre dans les répertoires")
+    parser.add_argument("--suffix", default=DEFAULT_SUFFIX, help="suffixe ajouté au nom des fichiers de sortie")
+    parser.add_argument("--force", action="store_true", help="recalculer les sorties déjà présentes")
+    parser.add_argument("--progress", type=float, default=PROGRESS_INTERVAL, help="intervalle des messages d'avancement (0 : aucun)")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = collect(args.inputs, args.output_dir, args.suffix, args.pattern)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    try:
+        report = run(jobs, args.workers, args.timeout, args.force, args.progress)
+    except KeyboardInterrupt:
+        print("Interrupted: completed outputs are kept, run again to resume", file=sys.stderr)
+        return 130
+    print(report.line())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main()) # pragma: no cover
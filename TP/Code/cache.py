@@ -0,0 +1,502 @@
+"""Caches des réponses de triangulation déjà sérialisées, en mémoire ou sur disque."""
+
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover - Windows : pas de verrou entre processus
+    fcntl = None
+
+
+def content_hasher():
+    """Renvoie un objet de hachage (update, hexdigest) qui calcule content_key par morceaux."""
+    return hashlib.blake2b(digest_size=16)
+
+def content_key(data):
+    """Empreinte du contenu binaire d'un PointSet, utilisée comme clé de cache."""
+    hasher = content_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """Cache LRU borné par le nombre total d'octets des valeurs stockées.
+
+    Les clés sont des empreintes de contenu (voir content_key) : un PointSet
+    modifié sous le même identifiant donne une autre clé et n'est jamais servi
+    périmé. Les compteurs hits, misses et evictions sont exposés par stats().
+    """
+
+    def __init__(self, max_bytes):
+        """Crée un cache vide pouvant contenir au plus max_bytes octets."""
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Renvoie la valeur associée à key (et la marque comme récente), ou None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        """Stocke value sous key en évinçant les entrées les moins récentes.
+
+        size est la taille comptée pour value (len(value) par défaut, à donner
+        pour une valeur composée). Une valeur plus grande que le cache entier
+        n'est pas stockée ; renvoie True si la valeur a été mise en cache.
+        """
+        if size is None:
+            size = len(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Compteurs et occupation du cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+
+class PendingEntry:
+    """Entrée de DiskResultStore en cours d'écriture, dans un fichier temporaire du même répertoire.
+
+    commit la publie par un renommage atomique ; abort (ou une taille qui
+    dépasse celle du cache) l'abandonne.
+    """
+
+    def __init__(self, store, key):
+        """Ouvre le fichier temporaire de l'entrée key."""
+        self._store = store
+        self._path = store.path(key)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=self._path.parent, prefix=DiskResultStore.TMP_PREFIX)
+        self._file = os.fdopen(fd, "wb")
+        self.size = 0
+
+    def write(self, chunk):
+        """Ajoute chunk à l'entrée ; une entrée plus grande que le cache entier est abandonnée."""
+        if self._file is None:
+            return
+        self.size += len(chunk)
+        if self.size > self._store.max_bytes:
+            self.abort()
+            return
+        self._file.write(chunk)
+
+    def commit(self):
+        """Publie l'entrée ; renvoie True si elle a été stockée.
+
+        Une OSError (disque plein, droits) est propagée ; abort supprime alors
+        le fichier temporaire.
+        """
+        if self._file is None:
+            return False
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
+        os.chmod(self._tmp, 0o444)
+        # Deux processus qui publient la même clé écrivent le même contenu : le dernier renommage l'emporte
+        os.replace(self._tmp, self._path)
+        self._tmp = None
+        self._store._added(self.size)
+        return True
+
+    def abort(self):
+        """Abandonne l'entrée et supprime le fichier temporaire, sans jamais lever d'OSError."""
+        if self._file is not None:
+            # La fermeture vide le tampon et peut échouer pour la même raison que l'écriture
+            with contextlib.suppress(OSError):
+                self._file.close()
+            self._file = None
+        if self._tmp is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(self._tmp)
+            self._tmp = None
+
+
+class FileLock:
+    """Verrou exclusif entre processus (flock) sur un fichier, pris dès la construction.
+
+    Le fichier de verrou est supprimé à la libération : un processus qui a
+    ouvert l'ancien fichier le constate une fois le verrou obtenu et
+    recommence sur le nouveau. Sans fcntl (Windows), le verrou ne protège
+    rien et ne bloque jamais.
+    """
+
+    # Intervalle entre deux tentatives quand un délai d'attente est donné
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, path, timeout=None):
+        """Ouvre path (créé si besoin) et attend d'obtenir le verrou ; lève TimeoutError au-delà de timeout secondes."""
+        self._path = path
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            f = open(path, "ab")  # noqa: SIM115 - fermé par release
+            if fcntl is None or (self._acquire(f, deadline) and self._is_current(f)):
+                break
+            f.close()
+        self._file = f
+
+    def _acquire(self, f, deadline):
+        if deadline is None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            return True
+        while True:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    f.close()
+                    raise TimeoutError(f"Lock {self._path} not acquired in time") from None
+                time.sleep(self.POLL_INTERVAL)
+
+    def _is_current(self, f):
+        """Indique si f est toujours le fichier de verrou (et non un fichier déjà supprimé par son détenteur)."""
+        try:
+            current = os.stat(self._path)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(f.fileno())
+        return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+    def release(self):
+        """Libère le verrou et supprime son fichier ; les appels suivants sont sans effet."""
+        if self._file is not None:
+            if fcntl is not None:
+                # Supprimé tant que le verrou est détenu : les processus en attente sur ce fichier recommencent
+                with contextlib.suppress(OSError):
+                    os.unlink(self._path)
+            self._file.close()
+            self._file = None
+
+
+class DiskResultStore:
+    """Cache de réponses sur disque, adressé par contenu et partagé entre processus et redémarrages.
+
+    Chaque entrée est un fichier immuable <répertoire>/<2 premiers caractères de la clé>/<clé>,
+    publié par renommage atomique (voir PendingEntry) : un lecteur voit soit
+    l'absence de l'entrée, soit l'entrée complète. Les lectures passent par un
+    fichier ouvert, servi sans être chargé en mémoire. La taille totale est
+    bornée par max_bytes : les entrées lues le moins récemment (atime, mis à
+    jour explicitement à chaque lecture, même avec un montage relatime ou
+    noatime) sont supprimées. Un fichier supprimé pendant qu'il est servi
+    reste lisible jusqu'à sa fermeture.
+    """
+
+    TMP_PREFIX = ".tmp-"
+    # Après éviction, l'occupation redescend à cette fraction de max_bytes
+    EVICTION_TARGET = 0.9
+    # Intervalle maximal entre deux parcours du répertoire, pour tenir compte des écritures des autres processus
+    SCAN_INTERVAL = 60.0
+    # Fichiers temporaires plus anciens que ce délai : restes d'un processus arrêté en cours d'écriture
+    STALE_TMP_SECONDS = 3600.0
+    # Répertoire des fichiers de verrou, un par clé en cours de calcul
+    LOCKS = ".locks"
+    # Attente maximale du verrou d'une clé, au-delà de laquelle le calcul est fait sans l'attendre
+    LOCK_TIMEOUT = 60.0
+
+    def __init__(self, directory, max_bytes):
+        """Crée (si besoin) le répertoire du cache, borné à max_bytes octets."""
+        self.directory = Path(directory)
+        (self.directory / self.LOCKS).mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Construit le cache à partir de RESULT_STORE_DIR et RESULT_STORE_MAX_BYTES, ou renvoie None s'il n'est pas configuré."""
+        directory = os.environ.get("RESULT_STORE_DIR")
+        if not directory:
+            return None
+        return cls(directory, int(os.environ.get("RESULT_STORE_MAX_BYTES", str(1024 ** 3))))
+
+    def path(self, key):
+        """Chemin du fichier de l'entrée key."""
+        return self.directory / key[:2] / key
+
+    def open(self, key, count=True):
+        """Renvoie l'entrée key ouverte en lecture binaire, ou None ; l'appelant ferme le fichier.
+
+        Avec count=False, la lecture n'est comptée ni comme succès ni comme échec.
+        """
+        path = self.path(key)
+        try:
+            f = open(path, "rb")  # noqa: SIM115 - fermé par l'appelant
+        except FileNotFoundError:
+            if count:
+                with self._lock:
+                    self.misses += 1
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path, (time.time(), os.fstat(f.fileno()).st_mtime))
+        if count:
+            with self._lock:
+                self.hits += 1
+        return f
+
+    def lock(self, key, timeout=LOCK_TIMEOUT):
+        """Prend le verrou entre processus de key et renvoie le FileLock à libérer.
+
+        Sert à ce qu'un seul processus calcule une entrée absente : les autres
+        attendent le verrou puis relisent l'entrée publiée. Le verrou ne doit
+        être gardé que jusqu'à la publication ; lève TimeoutError au-delà de
+        timeout secondes d'attente.
+        """
+        return FileLock(self.directory / self.LOCKS / key, timeout)
+
+    def writer(self, key):
+        """Renvoie une PendingEntry pour écrire l'entrée key par morceaux."""
+        return PendingEntry(self, key)
+
+    def put(self, key, data):
+        """Stocke data sous key ; renvoie True si la valeur a été stockée."""
+        pending = self.writer(key)
+        pending.write(data)
+        return pending.commit()
+
+    def _added(self, size):
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+            due = self._size is None or self._size > self.max_bytes or time.monotonic() - self._scanned_at > self.SCAN_INTERVAL
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Parcourt le répertoire et supprime les entrées les moins récemment lues si max_bytes est dépassé.
+
+        Renvoie l'occupation en octets après éviction.
+        """
+        now = time.time()
+        entries = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir() or shard.name.startswith("."):
+                continue
+            for item in os.scandir(shard.path):
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue
+                if item.name.startswith(self.TMP_PREFIX):
+                    if now - stat.st_mtime > self.STALE_TMP_SECONDS:
+                        with contextlib.suppress(FileNotFoundError):
+                            os.unlink(item.path)
+                    continue
+                entries.append((stat.st_atime, stat.st_size, item.path))
+                total += stat.st_size
+
+        evicted = 0
+        if total > self.max_bytes:
+            target = self.max_bytes * self.EVICTION_TARGET
+            entries.sort()
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                # L'entrée a pu être supprimée entre-temps par un autre processus
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                    evicted += 1
+                total -= size
+        with self._lock:
+            self._size = total
+            self._scanned_at = time.monotonic()
+            self.evictions += evicted
+        return total
+
+    def stats(self):
+        """Compteurs de ce processus et occupation connue au dernier parcours du répertoire."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class MeshEntry:
+    """Triangulation conservée pour un identifiant, avec le verrou qui sérialise ses mises à jour.
+
+    digest est l'empreinte (content_key) de la dernière version du PointSet
+    prise en compte dans mesh, size la taille estimée du maillage en octets
+    (voir MeshStore.resize).
+    """
+
+    __slots__ = ("digest", "lock", "mesh", "size")
+
+    def __init__(self):
+        """Crée une entrée vide : mesh et digest restent None tant que la triangulation n'est pas construite."""
+        self.lock = threading.Lock()
+        self.mesh = None
+        self.digest = None
+        self.size = 0
+
+
+class MeshStore:
+    """Triangulations incrémentales par identifiant de PointSet, en LRU borné par le nombre d'entrées et en octets.
+
+    Contrairement à ResultCache, les valeurs sont des objets modifiables : une
+    entrée évincée pendant qu'une requête la modifie reste valable pour cette
+    requête, mais la suivante repartira du PointSet en amont. Le registre est
+    propre au processus et n'est qu'une accélération : ce qu'il contient peut
+    disparaître à tout moment.
+    """
+
+    def __init__(self, max_entries, max_bytes=None):
+        """Crée un registre vide pouvant garder au plus max_entries triangulations et max_bytes octets (estimés)."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def entry(self, key):
+        """Renvoie l'entrée de key (créée vide si besoin) et la marque comme récente."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = MeshEntry()
+                while len(self._entries) > self.max_entries:
+                    self._size -= self._entries.popitem(last=False)[1].size
+            else:
+                self._entries.move_to_end(key)
+            return entry
+
+    def resize(self, key, entry, size):
+        """Enregistre la taille estimée de l'entrée de key puis évince les plus anciennes au-delà de max_bytes.
+
+        Une entrée plus grande que max_bytes à elle seule est évincée elle aussi.
+        """
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                # Déjà évincée : sa taille n'est plus comptée
+                return
+            self._size += size - entry.size
+            entry.size = size
+            while self.max_bytes is not None and self._size > self.max_bytes:
+                self._size -= self._entries.popitem(last=False)[1].size
+
+    def discard(self, key):
+        """Oublie la triangulation de key."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry.size
+
+    def clear(self):
+        """Oublie toutes les triangulations."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        """Nombre de triangulations conservées."""
+        return len(self._entries)
+
+
+
+class _Flight:
+    """Appel en cours de SingleFlight : son résultat ou son exception, et l'événement de fin."""
+
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Regroupe les appels concurrents de même clé : un seul s'exécute, les autres attendent son résultat.
+
+    Rien n'est conservé une fois l'appel terminé : un appel qui arrive après
+    la fin du précédent s'exécute de nouveau. Une exception est transmise à
+    tous les appelants en attente.
+    """
+
+    def __init__(self):
+        """Crée un regroupement sans appel en cours."""
+        self.executed = 0
+        self.shared = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        """Exécute fn(*args), ou attend l'appel déjà en cours pour key ; renvoie (résultat, partagé)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.executed += 1
+            else:
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn(*args)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
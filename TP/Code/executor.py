@@ -0,0 +1,149 @@
+"""Exécution de la triangulation, dans le thread de la requête ou dans un pool de processus."""
+
+import multiprocessing
+import os
+import signal
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
+
+import TP.Code.serializers as serializers
+import TP.Code.triangulation as triangulation
+
+
+class TriangulationTimeout(RuntimeError):
+    """La triangulation a dépassé le délai accordé à une tâche."""
+
+
+class WorkerCrashed(RuntimeError):
+    """Le processus qui exécutait la tâche s'est arrêté brutalement."""
+
+
+def _call_with_deadline(timeout, fn, *args):
+    """Tâche exécutée dans un processus : fn(*args), interrompue par TriangulationTimeout après timeout secondes.
+
+    Le délai court à partir du début de la tâche, pas de sa mise en file, et
+    seule cette tâche est interrompue : le processus reste disponible. Sans
+    SIGALRM (Windows), seul le délai de secours de TriangulationExecutor.run
+    s'applique.
+    """
+    if timeout is None or not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    def expire(signum, frame):
+        raise TriangulationTimeout(f"Triangulation timed out after {timeout}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _triangulate_packed(raw):
+    """Tâche exécutée dans un processus : PointSet binaire -> indices des triangles en uint32 aplatis."""
+    points = serializers.bytes_to_pointset(raw)["points"]
+    return array('I', chain.from_iterable(triangulation.triangulate(points))).tobytes()
+
+
+class TriangulationExecutor:
+    """Lance triangulate en ligne (mode "inline") ou dans un pool de processus (mode "process").
+
+    En mode "process", le PointSet est envoyé aux processus sous sa forme
+    binaire d'origine et les triangles reviennent en uint32 aplatis : rien n'est
+    sérialisé tuple par tuple. Au plus workers tâches sont confiées au pool à la
+    fois, si bien que les tâches envoyées sont en cours d'exécution et que
+    l'attente d'un processus libre ne compte pas dans leur délai. Le délai est
+    appliqué dans le processus lui-même (voir _call_with_deadline). Si un
+    processus meurt, ou ne rend pas la main KILL_GRACE secondes après son
+    délai, le pool est remplacé par un pool neuf.
+    """
+
+    # Marge après le délai avant d'arrêter de force un processus qui n'a pas réagi à SIGALRM
+    KILL_GRACE = 5.0
+
+    def __init__(self, mode="inline", workers=None, timeout=None):
+        """Prépare l'exécuteur ; le pool n'est créé qu'à la première tâche."""
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers)
+
+    @classmethod
+    def from_env(cls):
+        """Construit l'exécuteur à partir des variables TRIANGULATION_EXECUTOR, _WORKERS et _TIMEOUT."""
+        workers = os.environ.get("TRIANGULATION_WORKERS")
+        timeout = os.environ.get("TRIANGULATION_TIMEOUT")
+        return cls(
+            mode=os.environ.get("TRIANGULATION_EXECUTOR", "inline"),
+            workers=int(workers) if workers else None,
+            timeout=float(timeout) if timeout else None,
+        )
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _reset_pool(self, pool):
+        """Abandonne pool (s'il est toujours le pool courant) en arrêtant ses processus."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        # ProcessPoolExecutor ne sait pas interrompre une tâche en cours : on arrête ses processus.
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args):
+        """Exécute fn(*args) dans le pool avec le délai configuré, compté à partir du début de la tâche.
+
+        Un pool cassé par la mort d'un processus est remplacé et la tâche est
+        relancée une fois. Lève TriangulationTimeout ou WorkerCrashed.
+        """
+        hard_timeout = None if self.timeout is None else self.timeout + self.KILL_GRACE
+        with self._slots:
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    future = pool.submit(_call_with_deadline, self.timeout, fn, *args)
+                    return future.result(timeout=hard_timeout)
+                except FutureTimeoutError:
+                    # Processus bloqué hors de portée de SIGALRM (code natif) : dernier recours
+                    self._reset_pool(pool)
+                    raise TriangulationTimeout(f"Triangulation timed out after {self.timeout}s") from None
+                except BrokenProcessPool:
+                    self._reset_pool(pool)
+                    if attempt:
+                        raise WorkerCrashed("Triangulation worker crashed") from None
+
+    def triangulate(self, raw, points):
+        """Triangule le PointSet (binaire raw, déjà décodé en points) et renvoie (nombre de triangles, triangles).
+
+        En mode "process", les triangles sont un array('I') aplati accepté tel
+        quel par les fonctions de serializers.
+        """
+        if self.mode == "inline":
+            result = triangulation.triangulate(points)
+            return len(result), result
+        flat = array('I')
+        flat.frombytes(self.run(_triangulate_packed, bytes(raw)))
+        return len(flat) // 3, flat
+
+    def shutdown(self):
+        """Arrête le pool de processus s'il existe."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
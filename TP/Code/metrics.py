@@ -0,0 +1,212 @@
+"""Métriques du service au format texte de Prometheus et mesure des phases d'une requête.
+
+Les métriques sont de simples compteurs en mémoire protégés par un verrou :
+une observation coûte une recherche dichotomique et quelques additions, ce
+qui permet de les laisser actives en production.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Bornes des histogrammes : durées en secondes et tailles en nombre de points
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _labels(names, values, extra=""):
+    """Met en forme les étiquettes {nom="valeur",...} d'une ligne d'exposition."""
+    parts = []
+    for name, value in zip(names, values, strict=True):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _number(value):
+    """Met en forme une valeur numérique pour l'exposition Prometheus."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base commune : nom, description, noms d'étiquettes et valeurs par combinaison d'étiquettes."""
+
+    kind = None
+
+    def __init__(self, name, description, labelnames=()):
+        """Déclare la métrique ; labelnames donne l'ordre des valeurs d'étiquettes attendues."""
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        """Renvoie les lignes d'exposition de la métrique."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_values(items))
+        return lines
+
+    def _render_values(self, items):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in items]
+
+
+class Counter(_Metric):
+    """Compteur croissant, par combinaison d'étiquettes."""
+
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        """Ajoute amount au compteur des étiquettes labels."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        """Valeur courante du compteur."""
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """Valeur instantanée (par exemple le nombre de requêtes en cours)."""
+
+    kind = "gauge"
+
+    def inc(self, *labels, amount=1):
+        """Augmente la jauge de amount."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        """Diminue la jauge de amount."""
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels):
+        """Valeur courante de la jauge."""
+        return self._values.get(labels, 0)
+
+
+class Histogram(_Metric):
+    """Histogramme à bornes fixes ; les compteurs sont cumulés seulement à l'exposition."""
+
+    kind = "histogram"
+
+    def __init__(self, name, description, buckets, labelnames=()):
+        """Déclare l'histogramme avec des bornes supérieures croissantes (la borne +Inf est ajoutée)."""
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        """Enregistre une observation."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labels):
+        """Nombre d'observations enregistrées."""
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def _render_values(self, items):
+        lines = []
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += n
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class PhaseTimer:
+    """Durées des phases d'une requête, pour l'en-tête Server-Timing et l'histogramme des phases."""
+
+    __slots__ = ("histogram", "phases")
+
+    def __init__(self, histogram):
+        """Crée un chronométrage vide qui alimente histogram (étiquette : nom de la phase)."""
+        self.histogram = histogram
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name, observe=True):
+        """Chronomètre le bloc ; la durée est enregistrée même si le bloc lève une exception.
+
+        Avec observe=False, la durée n'est pas encore envoyée à l'histogramme
+        (voir stream).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases.append((name, elapsed))
+            if observe:
+                self.histogram.observe(elapsed, name)
+
+    def stream(self, chunks, name):
+        """Transmet les morceaux en cumulant le temps passé à les produire dans la phase name.
+
+        La durée déjà mesurée pour name (préparation avant l'envoi des en-têtes)
+        et celle de la production des morceaux sont enregistrées ensemble dans
+        l'histogramme une fois le flux terminé.
+        """
+        elapsed = sum(d for phase, d in self.phases if phase == name)
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                break
+            elapsed += time.perf_counter() - start
+            yield chunk
+        self.histogram.observe(elapsed, name)
+
+    def header(self):
+        """Valeur de l'en-tête Server-Timing (durées en millisecondes)."""
+        return ", ".join(f"{name};dur={elapsed * 1000:.3f}" for name, elapsed in self.phases)
+
+
+class ServiceMetrics:
+    """Métriques exposées par le service de triangulation."""
+
+    def __init__(self):
+        """Déclare les histogrammes, compteurs et jauges du service."""
+        self.phase_seconds = Histogram(
+            "triangulator_phase_seconds", "Duration of each /triangulate phase.", LATENCY_BUCKETS, ("phase",))
+        self.request_seconds = Histogram(
+            "triangulator_request_seconds", "Duration of HTTP requests, until the response is fully sent.",
+            LATENCY_BUCKETS, ("endpoint",))
+        self.input_points = Histogram(
+            "triangulator_input_points", "Number of points in triangulated PointSets.", SIZE_BUCKETS)
+        self.responses = Counter(
+            "triangulator_responses_total", "HTTP responses by endpoint and status code.", ("endpoint", "status"))
+        self.in_flight = Gauge(
+            "triangulator_in_flight_requests", "Requests currently being processed.", ("endpoint",))
+        self.coalesced = Counter(
+            "triangulator_coalesced_total", "Requests that waited for an identical in-flight fetch or triangulation.",
+            ("stage",))
+        self._metrics = (
+            self.phase_seconds, self.request_seconds, self.input_points, self.responses, self.in_flight, self.coalesced)
+
+    def timer(self):
+        """Renvoie un PhaseTimer relié à l'histogramme des phases."""
+        return PhaseTimer(self.phase_seconds)
+
+    def render(self):
+        """Texte d'exposition de toutes les métriques."""
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
@@ -0,0 +1,63 @@
+"""Étapes communes du traitement d'un PointSet : décodage, triangulation, encodage de la réponse.
+
+Chaque étape traduit ses erreurs en PipelineError, qui porte le code HTTP et
+le corps JSON à renvoyer ; l'application Flask et la variante ASGI partagent
+ainsi les mêmes codes d'erreur.
+"""
+
+from itertools import chain
+
+import TP.Code.serializers as serializers
+
+
+class PipelineError(Exception):
+    """Échec d'une étape du traitement, avec le code HTTP et le corps JSON de la réponse."""
+
+    def __init__(self, status, body):
+        """Crée l'erreur à partir du code HTTP et du corps JSON (dictionnaire) à renvoyer."""
+        super().__init__(body["error"])
+        self.status = status
+        self.body = body
+
+
+def parse(raw):
+    """Décode le PointSet binaire raw et renvoie ses points (400 si format invalide, 422 sinon)."""
+    try:
+        return serializers.bytes_to_pointset(raw)["points"]
+    except ValueError as e:
+        raise PipelineError(400, {"error": "Invalid PointSet format", "details": str(e)}) from e
+    except Exception as e:
+        raise PipelineError(422, {"error": "Malformed data"}) from e
+
+
+def triangulate(raw, points, executor):
+    """Triangule via executor et renvoie (nombre de triangles, triangles) (422 si données non triangulables, 500 sinon)."""
+    try:
+        return executor.triangulate(raw, points)
+    except ValueError as e:
+        raise PipelineError(422, {"error": str(e)}) from e
+    except Exception as e:
+        raise PipelineError(500, {"error": "Triangulation failed", "details": str(e)}) from e
+
+
+def encode(n_triangles, triangles, points):
+    """Prépare la réponse binaire et renvoie (taille totale, itérateur de morceaux) (500 en cas d'échec).
+
+    Le premier morceau est produit ici, pour qu'une erreur de sérialisation
+    puisse encore donner une réponse d'erreur avant l'envoi des en-têtes.
+    """
+    try:
+        chunks = serializers.iter_triangles_bytes(n_triangles, triangles, len(points), points)
+        first_chunk = next(chunks)
+    except Exception as e:
+        raise PipelineError(500, {"error": "Serialization failed"}) from e
+    return serializers.encoded_size(n_triangles, len(points)), chain([first_chunk], chunks)
+
+
+def encode_compact(n_triangles, triangles, points, compress=False):
+    """Prépare la réponse au format compact (voir serializers.triangles_to_compact), avec la même interface qu'encode."""
+    try:
+        body = serializers.triangles_to_compact(n_triangles, triangles, len(points), compress)
+    except Exception as e:
+        raise PipelineError(500, {"error": "Serialization failed"}) from e
+    return len(body), iter([body])
@@ -1,33 +1,169 @@
 """Module de serialization et deserialisation de pointset et triangles."""
 
 import struct
+import sys
+import zlib
+from array import array
+from itertools import chain, islice
+from operator import itemgetter
 
 
+class PointSet:
+    """Ensemble de points stocké en colonnes, qui se comporte comme une liste de tuples (x, y).
+
+    coords est une vue 'd' entrelacée [x0, y0, x1, y1, ...] ; xs et ys en sont
+    des vues avec un pas de 2, sans copie des données.
+    """
+
+    __slots__ = ("coords", "xs", "ys")
+
+    def __init__(self, coords):
+        """Construit le PointSet à partir d'une vue entrelacée de 2 * N doubles."""
+        self.coords = coords
+        self.xs = coords[0::2]
+        self.ys = coords[1::2]
+
+    def __len__(self):
+        """Nombre de points."""
+        return len(self.xs)
+
+    def __getitem__(self, i):
+        """Renvoie le point i sous forme de tuple (x, y), ou une liste de tuples pour une tranche."""
+        if isinstance(i, slice):
+            return list(zip(self.xs[i], self.ys[i], strict=True))
+        return (self.xs[i], self.ys[i])
+
+    def __iter__(self):
+        """Itère sur les points sous forme de tuples (x, y)."""
+        return zip(self.xs, self.ys, strict=True)
+
+    def __eq__(self, other):
+        """Compare point à point avec un autre PointSet ou une séquence de couples."""
+        if isinstance(other, PointSet):
+            return self.coords.tolist() == other.coords.tolist()
+        try:
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other, strict=True))
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        """Représentation sous forme de liste de tuples."""
+        return f"PointSet({list(self)!r})"
+
+
+def _coords_view(data, nbr_point):
+    """Vue 'd' sur les 2 * nbr_point doubles qui suivent l'en-tête, sans copie si possible."""
+    raw = memoryview(data)[4:4 + nbr_point * 16]
+    if sys.byteorder == "little":
+        return raw.cast('B').cast('d')
+    # Machine gros-boutiste : une seule copie, puis inversion des octets en bloc
+    coords = array('d')
+    coords.frombytes(raw)
+    coords.byteswap()
+    return memoryview(coords)
+
 def bytes_to_pointset(data):
     """Désérialise un flux binaire en dictionnaire de points.
 
     Format: [NbPoints: uint32] [x: double, y: double]...
     Resultat: (x,y)
+
+    Les coordonnées ne sont pas décodées point par point : "points" est un
+    PointSet qui lit directement dans le tampon reçu.
     """
     if len(data) < 4:
         raise ValueError("Insufficient bytes for the specified number of points")
     
     # Lecture du nombre de points (Little Endian unsigned int)
-    nbr_point = struct.unpack('<I', data[:4])[0]
+    nbr_point = struct.unpack_from('<I', data)[0]
     
     expected_size = 4 + (nbr_point * 16) # 4 bytes header + N * (8+8 bytes)
     if len(data) < expected_size:
         raise ValueError("Insufficient bytes for the specified number of points")
     
-    points = []
-    offset = 4
-    for _ in range(nbr_point):
-        # Lecture de deux doubles (8 bytes chacun)
-        x, y = struct.unpack('<dd', data[offset:offset+16])
-        points.append((x, y))
-        offset += 16
-        
-    return {"nbr_point": nbr_point, "points": points}
+    return {"nbr_point": nbr_point, "points": PointSet(_coords_view(data, nbr_point))}
+
+class PointSetParser:
+    """Décodeur incrémental du format de bytes_to_pointset, alimenté morceau par morceau (feed) puis terminé par close.
+
+    L'en-tête est vérifié dès ses 4 octets reçus : si la taille totale du flux
+    est connue (total_size, par exemple l'en-tête Content-Length) et qu'elle
+    ne suffit pas pour le nombre de points annoncé, l'erreur est levée tout de
+    suite, sans attendre la suite. Les octets sont recopiés une seule fois,
+    dans un tampon alloué d'un bloc quand total_size confirme sa taille.
+    """
+
+    __slots__ = ("_buffer", "_expected", "_filled", "nbr_point", "total_size")
+
+    def __init__(self, total_size=None):
+        """Crée un décodeur vide ; total_size est la taille annoncée du flux, si elle est connue."""
+        self.total_size = total_size
+        self.nbr_point = None
+        self._buffer = bytearray()
+        self._expected = None
+        self._filled = 0
+
+    def _start(self):
+        """Lit l'en-tête et prépare le tampon des points."""
+        self.nbr_point = struct.unpack_from('<I', self._buffer)[0]
+        self._expected = 4 + self.nbr_point * 16
+        if self.total_size is not None and self.total_size < self._expected:
+            raise ValueError("Insufficient bytes for the specified number of points")
+        received = self._buffer[:self._expected]
+        if self.total_size is not None:
+            # Taille confirmée par l'appelant : allocation unique, remplie au fil des morceaux
+            self._buffer = bytearray(self._expected)
+            self._buffer[:len(received)] = received
+        else:
+            self._buffer = received
+        self._filled = len(received)
+
+    def feed(self, chunk):
+        """Ajoute un morceau du flux ; les octets au-delà des points annoncés sont ignorés."""
+        if self._expected is None:
+            self._buffer += chunk
+            self._filled = len(self._buffer)
+            if self._filled >= 4:
+                self._start()
+            return
+        count = min(len(chunk), self._expected - self._filled)
+        if count <= 0:
+            return
+        if self.total_size is not None:
+            self._buffer[self._filled:self._filled + count] = memoryview(chunk)[:count]
+        else:
+            self._buffer += memoryview(chunk)[:count]
+        self._filled += count
+
+    @property
+    def data(self):
+        """Octets reçus (en-tête et points), sans copie."""
+        return self._buffer
+
+    def close(self):
+        """Termine le flux et renvoie le même dictionnaire que bytes_to_pointset ; lève ValueError s'il est tronqué."""
+        if self._expected is None or self._filled < self._expected:
+            raise ValueError("Insufficient bytes for the specified number of points")
+        return {"nbr_point": self.nbr_point, "points": PointSet(_coords_view(self._buffer, self.nbr_point))}
+
+
+def _flat_bytes(values, typecode, count):
+    """Octets little-endian de count valeurs déjà aplaties (array, memoryview) ou à aplatir (séquence de tuples)."""
+    if isinstance(values, PointSet):
+        values = values.coords
+    flat_typecode = getattr(values, "typecode", None) or getattr(values, "format", None)
+    if flat_typecode == typecode and len(values) == count and sys.byteorder == "little":
+        return values
+    if not isinstance(values, (array, memoryview)):
+        values = chain.from_iterable(values)
+    flat = array(typecode, values)
+    if len(flat) != count:
+        raise ValueError("Item count does not match the header")
+    if sys.byteorder != "little":
+        flat.byteswap()
+    return flat
 
 def triangles_to_bytes(n_triangles, triangles, n_pts, pts):
     """Sérialise les points et les triangles en binaire.
@@ -35,24 +171,225 @@ def triangles_to_bytes(n_triangles, triangles, n_pts, pts):
     Format: 
     [NbPoints: uint32] [x, y]... 
     [NbTriangles: uint32] [p1, p2, p3 (uint32)]...
+
+    La taille de sortie est calculée à l'avance et le tampon rempli en bloc.
+    pts peut être une séquence de couples ou un PointSet, triangles une
+    séquence de triplets ou un array('I') déjà aplati : les données déjà
+    aplaties sont copiées telles quelles. Le résultat est un bytearray.
     """
     # Récupération des valeurs (gestion des mocks/callables)
     if n_triangles == 0 and n_pts >= 0:
         # Cas vide spécifique demandé par un test, mais techniquement valide
         raise ValueError("No triangles to serialize") 
 
+    points_end = 4 + 16 * n_pts
+    size = points_end + 4 + 12 * n_triangles
+    output = bytearray(size)
 
     # 1. Sérialisation des points
-    output = bytearray()
-    output.extend(struct.pack('<I', n_pts))
-    for p in pts:
-        output.extend(struct.pack('<dd', p[0], p[1]))
-        
-    # 2. Sérialisation des triangles
-    output.extend(struct.pack('<I', n_triangles))
-    for t in triangles:
-        # 3 indices d'entiers non signés
-        output.extend(struct.pack('<III', t[0], t[1], t[2]))
-        
-    return bytes(output)
+    struct.pack_into('<I', output, 0, n_pts)
+    output[4:points_end] = memoryview(_flat_bytes(pts, 'd', 2 * n_pts)).cast('B')
+
+    # 2. Sérialisation des triangles (3 indices d'entiers non signés)
+    struct.pack_into('<I', output, points_end, n_triangles)
+    output[points_end + 4:] = memoryview(_flat_bytes(triangles, 'I', 3 * n_triangles)).cast('B')
+
+    return output
+
+
+# Format compact : drapeau de compression zlib et taille de l'en-tête [Flags: uint8] [NbPoints: uint32] [NbTriangles: uint32]
+COMPACT_ZLIB = 0x01
+COMPACT_HEADER_SIZE = 9
+# Niveau 1 : à peine moins compact que le niveau par défaut, et plusieurs fois plus rapide sur ces données
+COMPACT_ZLIB_LEVEL = 1
+
+def _compact_typecode(n_pts):
+    """Type des indices du format compact : uint16 si tous les indices tiennent sur 16 bits, uint32 sinon."""
+    return 'H' if n_pts <= 0x10000 else 'I'
+
+def triangles_to_compact(n_triangles, triangles, n_pts, compress=False):
+    """Sérialise les triangles seuls, dans un format compact pour les clients qui ont déjà les points.
+
+    Format:
+    [Flags: uint8] [NbPoints: uint32] [NbTriangles: uint32]
+    [da, b - a, c - a (uint16 si NbPoints <= 65536, uint32 sinon)]...
+
+    Chaque triangle est tourné pour commencer par son plus petit indice (le
+    sens de parcours est conservé) et les triangles sont triés selon ce
+    premier indice : a est codé par son écart au a du triangle précédent, b
+    et c par leur écart à a. Les valeurs sont ainsi petites et répétitives,
+    ce qui profite à la compression zlib optionnelle (drapeau COMPACT_ZLIB,
+    sur tout ce qui suit l'en-tête). L'ordre des triangles n'est donc pas celui de triangles.
+    """
+    if n_triangles == 0 and n_pts >= 0:
+        raise ValueError("No triangles to serialize")
+    if isinstance(triangles, (array, memoryview)):
+        items = iter(triangles)
+        triangles = zip(items, items, items, strict=True)
+    ordered = [(a, b, c) if a < b and a < c else (b, c, a) if b < c else (c, a, b) for a, b, c in triangles]
+    ordered.sort(key=itemgetter(0))
+    if len(ordered) != n_triangles:
+        raise ValueError("Item count does not match the header")
+    if max(map(max, ordered)) >= n_pts:
+        raise ValueError("Triangle index out of range")
+
+    previous = [0, *(t[0] for t in ordered)]
+    values = array(_compact_typecode(n_pts), chain.from_iterable(
+        (a - p, b - a, c - a) for p, (a, b, c) in zip(previous, ordered, strict=False)
+    ))
+    if sys.byteorder != "little":
+        values.byteswap()
+    payload = values.tobytes()
+    if compress:
+        payload = zlib.compress(payload, COMPACT_ZLIB_LEVEL)
+    return struct.pack('<BII', COMPACT_ZLIB if compress else 0, n_pts, n_triangles) + payload
+
+def compact_to_triangles(data):
+    """Désérialise le format compact de triangles_to_compact.
+
+    Renvoie {"nbr_point": NbPoints, "triangles": liste de triplets d'indices},
+    dans l'ordre canonique du format. La décompression est bornée à la taille
+    annoncée par l'en-tête : un flux compressé qui produit davantage est refusé.
+    """
+    if len(data) < COMPACT_HEADER_SIZE:
+        raise ValueError("Insufficient bytes for the compact header")
+    flags, n_pts, n_triangles = struct.unpack_from('<BII', data)
+    if flags & ~COMPACT_ZLIB:
+        raise ValueError("Unknown compact format flags")
+    typecode = _compact_typecode(n_pts)
+    expected = 3 * n_triangles * array(typecode).itemsize
+    payload = memoryview(data)[COMPACT_HEADER_SIZE:]
+    if flags & COMPACT_ZLIB:
+        decompressor = zlib.decompressobj()
+        try:
+            # Un octet de plus que la taille annoncée suffit à détecter un excédent ; max_length=0 serait sans limite
+            payload = decompressor.decompress(payload, expected + 1)
+        except zlib.error as e:
+            raise ValueError("Invalid compressed payload") from e
+        if len(payload) > expected or decompressor.unused_data:
+            raise ValueError("Unexpected bytes after the compressed triangles")
+        if not decompressor.eof:
+            raise ValueError("Insufficient bytes for the compressed payload")
+    if len(payload) < expected:
+        raise ValueError("Insufficient bytes for the specified number of triangles")
+
+    values = array(typecode)
+    values.frombytes(payload[:expected])
+    if sys.byteorder != "little":
+        values.byteswap()
+    triangles = []
+    a = 0
+    for i in range(0, len(values), 3):
+        a += values[i]
+        triangles.append((a, a + values[i + 1], a + values[i + 2]))
+    return {"nbr_point": n_pts, "triangles": triangles}
+
+
+# Taille visée pour chaque morceau produit par iter_triangles_bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def encoded_size(n_triangles, n_pts):
+    """Taille en octets de la sérialisation produite par triangles_to_bytes."""
+    return 4 + 16 * n_pts + 4 + 12 * n_triangles
+
+def _iter_blocks(values, count, width, typecode, per_block):
+    """Découpe count éléments de width valeurs en blocs d'octets little-endian d'au plus per_block éléments."""
+    if isinstance(values, PointSet):
+        values = values.coords
+    flat = isinstance(values, (array, memoryview))
+    items = None if flat else iter(values)
+    for start in range(0, count, per_block):
+        size = min(per_block, count - start)
+        block = values[start * width:(start + size) * width] if flat else list(islice(items, size))
+        yield bytes(memoryview(_flat_bytes(block, typecode, size * width)).cast('B'))
+
+def iter_triangles_bytes(n_triangles, triangles, n_pts, pts, chunk_size=STREAM_CHUNK_SIZE):
+    """Sérialise comme triangles_to_bytes, mais par morceaux d'environ chunk_size octets.
+
+    Renvoie un itérateur qui produit l'en-tête des points, les blocs de points,
+    l'en-tête des triangles puis les blocs de triangles. Les vérifications
+    (aucun triangle, nombre d'éléments incohérent) sont faites dès l'appel,
+    avant le premier morceau, pour pouvoir encore répondre par une erreur.
+    """
+    if n_triangles == 0 and n_pts >= 0:
+        raise ValueError("No triangles to serialize")
+    for values, count, width in ((pts, n_pts, 2), (triangles, n_triangles, 3)):
+        if isinstance(values, (array, memoryview)):
+            if len(values) != count * width:
+                raise ValueError("Item count does not match the header")
+        elif hasattr(values, "__len__") and len(values) != count:
+            raise ValueError("Item count does not match the header")
+
+    def chunks():
+        yield struct.pack('<I', n_pts)
+        yield from _iter_blocks(pts, n_pts, 2, 'd', max(1, chunk_size // 16))
+        yield struct.pack('<I', n_triangles)
+        yield from _iter_blocks(triangles, n_triangles, 3, 'I', max(1, chunk_size // 12))
+
+    return chunks()
+
+
+def iter_batch_bytes(n_items, items):
+    """Sérialise par morceaux une réponse de lot, élément par élément.
+
+    Format:
+    [NbItems: uint32]
+    [Status: uint16] [Length: uint32] [Body: Length octets]...
+
+    items produit des couples (status, body) : body est la sortie de
+    triangles_to_bytes quand status vaut 200, un message d'erreur JSON sinon.
+    """
+    yield struct.pack('<I', n_items)
+    for status, body in items:
+        yield struct.pack('<HI', status, len(body))
+        yield bytes(body)
+
+def bytes_to_batch(data):
+    """Désérialise une réponse de lot en liste de couples (status, body)."""
+    if len(data) < 4:
+        raise ValueError("Insufficient bytes for the batch header")
+    n_items = struct.unpack_from('<I', data)[0]
+    items = []
+    offset = 4
+    for _ in range(n_items):
+        if len(data) < offset + 6:
+            raise ValueError("Insufficient bytes for the batch item header")
+        status, length = struct.unpack_from('<HI', data, offset)
+        offset += 6
+        if len(data) < offset + length:
+            raise ValueError("Insufficient bytes for the batch item body")
+        items.append((status, bytes(data[offset:offset + length])))
+        offset += length
+    return items
+
+
+def delta_to_bytes(removed, added):
+    """Sérialise le delta d'une insertion incrémentale (voir triangulation.Triangulation.insert).
+
+    Format:
+    [NbRemoved: uint32] [p1, p2, p3 (uint32)]...
+    [NbAdded: uint32] [p1, p2, p3 (uint32)]...
+    """
+    removed_end = 4 + 12 * len(removed)
+    output = bytearray(removed_end + 4 + 12 * len(added))
+    struct.pack_into('<I', output, 0, len(removed))
+    output[4:removed_end] = memoryview(_flat_bytes(removed, 'I', 3 * len(removed))).cast('B')
+    struct.pack_into('<I', output, removed_end, len(added))
+    output[removed_end + 4:] = memoryview(_flat_bytes(added, 'I', 3 * len(added))).cast('B')
+    return output
 
+def bytes_to_delta(data):
+    """Désérialise un delta en couple (removed, added) de listes de triplets d'indices."""
+    triangles = []
+    offset = 0
+    for _ in range(2):
+        if len(data) < offset + 4:
+            raise ValueError("Insufficient bytes for the delta header")
+        count = struct.unpack_from('<I', data, offset)[0]
+        offset += 4
+        if len(data) < offset + 12 * count:
+            raise ValueError("Insufficient bytes for the specified number of triangles")
+        flat = struct.unpack_from(f'<{3 * count}I', data, offset)
+        triangles.append([flat[i:i + 3] for i in range(0, len(flat), 3)])
+        offset += 12 * count
+    return triangles[0], triangles[1]
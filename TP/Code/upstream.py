@@ -0,0 +1,182 @@
+"""Client HTTP partagé vers le PointSetManager (pool de connexions, délais, reprises)."""
+
+import asyncio
+import os
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import TP.Code.serializers as serializers
+
+try:
+    import httpx
+except ImportError: # pragma: no cover - seule la variante ASGI en a besoin (requirements.txt)
+    httpx = None
+
+DEFAULT_POINT_SET_MANAGER_URL = "http://localhost:5001/pointsets"
+# Taille maximale d'un PointSet reçu par AsyncPointSetClient (4 millions de points) et taille des morceaux lus
+MAX_POINTSET_BYTES = 4 + 16 * 4_000_000
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def _settings_from_env():
+    """Paramètres du client lus dans les variables d'environnement POINT_SET_MANAGER_*."""
+    return {
+        "base_url": os.environ.get("POINT_SET_MANAGER_URL", DEFAULT_POINT_SET_MANAGER_URL),
+        "pool_size": int(os.environ.get("POINT_SET_MANAGER_POOL_SIZE", "10")),
+        "connect_timeout": float(os.environ.get("POINT_SET_MANAGER_CONNECT_TIMEOUT", "2.0")),
+        "read_timeout": float(os.environ.get("POINT_SET_MANAGER_READ_TIMEOUT", "30.0")),
+        "retries": int(os.environ.get("POINT_SET_MANAGER_RETRIES", "2")),
+    }
+
+
+def _pointset_url(base_url, pointset_id):
+    """URL du PointSet pointset_id : l'identifiant forme un seul segment de chemin (espaces, ? et # encodés)."""
+    return f"{base_url}/{quote(pointset_id, safe='')}"
+
+
+class PointSetClient:
+    """Client du PointSetManager qui réutilise ses connexions.
+
+    Une seule requests.Session est partagée : ses connexions restent ouvertes
+    (keep-alive) dans un pool de pool_size connexions. Chaque requête a un délai
+    de connexion et un délai de lecture ; les erreurs réseau et les réponses
+    502/503/504 sont retentées au plus retries fois, avec une attente
+    exponentielle (backoff_factor * 2 ** tentative).
+    """
+
+    def __init__(self, base_url=DEFAULT_POINT_SET_MANAGER_URL, pool_size=10, connect_timeout=2.0,
+                 read_timeout=30.0, retries=2, backoff_factor=0.1):
+        """Crée le client et sa session ; aucune connexion n'est ouverte à ce stade."""
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_env(cls):
+        """Construit un client à partir des variables d'environnement POINT_SET_MANAGER_*."""
+        return cls(**_settings_from_env())
+
+    def url_for(self, pointset_id):
+        """URL du PointSet pointset_id."""
+        return _pointset_url(self.base_url, pointset_id)
+
+    def get_pointset(self, pointset_id, **kwargs):
+        """Récupère le PointSet pointset_id ; lève requests.RequestException en cas d'échec réseau."""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(self.url_for(pointset_id), **kwargs)
+
+    def close(self):
+        """Ferme les connexions du pool."""
+        self.session.close()
+
+
+class UpstreamError(Exception):
+    """Le PointSetManager est injoignable ou a renvoyé une réponse inexploitable."""
+
+
+class AsyncPointSetClient:
+    """Client non bloquant du PointSetManager, basé sur httpx.AsyncClient.
+
+    Les connexions sont réutilisées (keep-alive, pool de pool_size
+    connexions) et aucun thread n'est bloqué pendant l'attente du
+    PointSetManager. Les délais et la politique de reprise sont les mêmes que
+    ceux de PointSetClient. Le corps est lu en flux, décompressé selon
+    Content-Encoding, et décodé au fil des morceaux par
+    serializers.PointSetParser : il n'est jamais gardé en double, et un
+    PointSet de plus de max_bytes octets est refusé sans être lu en entier.
+    """
+
+    def __init__(self, base_url=DEFAULT_POINT_SET_MANAGER_URL, pool_size=10, connect_timeout=2.0, read_timeout=30.0,
+                 retries=2, backoff_factor=0.1, max_bytes=MAX_POINTSET_BYTES):
+        """Crée le client ; aucune connexion n'est ouverte à ce stade."""
+        if httpx is None:
+            raise RuntimeError("AsyncPointSetClient requires httpx (see requirements.txt)")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_bytes = max_bytes
+        self._client = None
+        self._loop = None
+
+    @classmethod
+    def from_env(cls):
+        """Construit un client à partir des mêmes variables d'environnement que PointSetClient."""
+        return cls(**_settings_from_env())
+
+    def _session(self):
+        """Renvoie le httpx.AsyncClient de la boucle d'événements courante (ses connexions lui sont propres)."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits,
+                                             headers={"Accept": "application/octet-stream"})
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        """Ferme les connexions du pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_pointset(self, pointset_id):
+        """Récupère le PointSet pointset_id et renvoie (status, corps).
+
+        Le corps n'est lu que pour une réponse 200 (b"" sinon). Les erreurs
+        réseau et les réponses 502/503/504 sont retentées ; lève UpstreamError
+        quand les tentatives sont épuisées ou que le PointSet dépasse
+        max_bytes, ValueError si le corps n'est pas un PointSet valide.
+        """
+        url = _pointset_url(self.base_url, pointset_id)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff_factor * 2 ** (attempt - 1))
+            try:
+                status, body = await self._get(url)
+            except httpx.TransportError as e:
+                # Connexion refusée ou coupée, délai dépassé, réponse qui n'est pas du HTTP
+                error = UpstreamError(f"{type(e).__name__}: {e}")
+                continue
+            if status not in (502, 503, 504):
+                return status, body
+            error = UpstreamError(f"HTTP {status}")
+        raise error
+
+    async def _get(self, url):
+        async with self._session().stream("GET", url) as response:
+            if response.status_code != 200:
+                return response.status_code, b""
+            # Content-Length ne donne la taille décodée que si le corps n'est pas compressé (aiter_bytes décompresse)
+            length = response.headers.get("Content-Length")
+            if response.headers.get("Content-Encoding", "identity").lower() != "identity":
+                length = None
+            length = int(length) if length else None
+            too_large = UpstreamError(f"PointSet larger than {self.max_bytes} bytes")
+            if length is not None and length > self.max_bytes:
+                raise too_large
+            parser = serializers.PointSetParser(length)
+            received = 0
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                parser.feed(chunk)
+                if received > self.max_bytes or (parser.nbr_point or 0) * 16 + 4 > self.max_bytes:
+                    raise too_large
+            parser.close()
+            return 200, parser.data
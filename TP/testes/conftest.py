@@ -1,12 +1,16 @@
 """Fixtures communes pour les tests."""
 
+import gzip
 import os
 import struct
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 
-from TP.Code.app import app
+from TP.Code.app import app, mesh_store, result_cache, upstream_versions
 
 # S'assurer que les imports TP.Code.* fonctionnent
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -19,6 +23,9 @@ if ROOT not in sys.path:
 def flask_test_client():
     """Fixture pour le client de test Flask."""
     app.config["TESTING"] = True
+    result_cache.clear()
+    upstream_versions.clear()
+    mesh_store.clear()
     with app.test_client() as client:
         yield client
 
@@ -32,4 +39,55 @@ def sample_triangle_pointset_bytes():
     b += struct.pack('<dd', 0.0, 0.0)
     b += struct.pack('<dd', 1.0, 0.0)
     b += struct.pack('<dd', 0.0, 1.0)
-    return b
\ No newline at end of file
+    return b
+
+
+class _PointSetManagerHandler(BaseHTTPRequestHandler):
+    """Faux PointSetManager : sert les réponses programmées dans server.routes."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        """Compte les connexions TCP ouvertes par les clients."""
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        """Renvoie la prochaine réponse (status, body, delay) programmée pour ce PointSetID.
+
+        Si server.gzip est vrai, le corps est compressé pour les clients qui l'acceptent.
+        """
+        pointset_id = self.path.rsplit("/", 1)[-1]
+        self.server.requests.append(pointset_id)
+        answers = self.server.routes.get(pointset_id, [(404, b"", 0.0)])
+        status, body, delay = answers.pop(0) if len(answers) > 1 else answers[0]
+        if delay:
+            time.sleep(delay)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        if self.server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Pas de journalisation pendant les tests."""
+
+
+@pytest.fixture
+def pointset_manager_server():
+    """Démarre un faux PointSetManager local ; server.routes associe un PointSetID à ses réponses."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PointSetManagerHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.requests = []
+    server.connections = 0
+    server.gzip = False
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/pointsets"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -9,14 +9,16 @@ import pytest
 import requests
 
 
-def _make_resp(status_code=200, content=b''):
+def _make_resp(status_code=200, content=b'', headers=None):
     """Retourne un Mock qui ressemble à l'objet Response utilisé par le code.
 
-    (status_code, content, raise_for_status()).
+    (status_code, content, headers, iter_content(), raise_for_status()).
     """
     resp = Mock()
     resp.status_code = status_code
     resp.content = content
+    resp.headers = headers or {}
+    resp.iter_content.side_effect = lambda chunk_size=1: (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
     # Par défaut raise_for_status ne lève pas ; si status >= 400 on simule une erreur.
     if status_code >= 400:
         def _raise():
@@ -28,7 +30,7 @@ def _make_resp(status_code=200, content=b''):
 
 
 def test_get_triangulate_with_valid_pointsetid(flask_test_client, sample_triangle_pointset_bytes):
-    """Mock de requests.get pour renvoyer un PointSet binaire valide.
+    """Mock de requests.Session.get pour renvoyer un PointSet binaire valide.
 
     Vérifie que l'endpoint /triangulate/<id> renvoie du binaire et un code 200/201.
     """
@@ -36,9 +38,9 @@ def test_get_triangulate_with_valid_pointsetid(flask_test_client, sample_triangl
     if client is None:
         pytest.skip("Flask test client non disponible")
 
-    # cela remplace requests.get qui doit nous renvoyer les points à partir de PointSetManage  par un mock
-    # si comme si on dit si quelqu'un fait requests.get(...) on lui renvoie un Mock qui a le contenu sample_triangle_pointset_bytes
-    with patch("requests.get") as mock_get:
+    # cela remplace requests.Session.get qui doit nous renvoyer les points à partir de PointSetManage  par un mock
+    # si comme si on dit si quelqu'un fait session.get(...) on lui renvoie un Mock qui a le contenu sample_triangle_pointset_bytes
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
 
         resp = client.get("/triangulate/42")
@@ -56,7 +58,7 @@ def test_get_triangulate_with_valid_pointsetid(flask_test_client, sample_triangl
         assert "pointset" in called_args[0] or "PointSet" in called_args[0] or isinstance(called_args[0], str)
 
 def test_pointsetid_not_found_returns_404(flask_test_client):
-    """Mock de requests.get pour renvoyer 404 depuis le PointSetManager.
+    """Mock de requests.Session.get pour renvoyer 404 depuis le PointSetManager.
 
     Triangulator doit propager un 404 (ou 422 selon design).
     """
@@ -64,7 +66,7 @@ def test_pointsetid_not_found_returns_404(flask_test_client):
     if client is None:
         pytest.skip("Flask test client non disponible")
 
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(404, b"")
 
         resp = client.get("/triangulate/99999")
@@ -73,7 +75,7 @@ def test_pointsetid_not_found_returns_404(flask_test_client):
         mock_get.assert_called()
 
 def test_malformed_pointset_from_manager_returns_400(flask_test_client):
-    """Mock de requests.get pour renvoyer un payload binaire corrompu.
+    """Mock de requests.Session.get pour renvoyer un payload binaire corrompu.
 
     Triangulator doit détecter le format invalide et renvoyer 400/422/500 selon implémentation.
     """
@@ -81,7 +83,7 @@ def test_malformed_pointset_from_manager_returns_400(flask_test_client):
     if client is None:
         pytest.skip("Flask test client non disponible")
 
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         # Binaire trop court / corrompu
         mock_get.return_value = _make_resp(200, b"\x00\x01")
 
@@ -93,7 +95,7 @@ def test_malformed_pointset_from_manager_returns_400(flask_test_client):
 def test_network_error_returns_503(flask_test_client):
     """Simule une erreur réseau (requests.exceptions.RequestException) -> 503."""
     client = flask_test_client
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.side_effect = requests.exceptions.ConnectionError("down")
         resp = client.get("/triangulate/42")
         assert resp.status_code == 503
@@ -101,7 +103,7 @@ def test_network_error_returns_503(flask_test_client):
 def test_deserialization_generic_error_returns_422(flask_test_client, monkeypatch):
     """Simule une Exception générique dans bytes_to_pointset -> 400."""
     client = flask_test_client
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(200, b"\x00\x00\x00\x00")
         # force une Exception dans bytes_to_pointset
         monkeypatch.setattr(
@@ -122,7 +124,7 @@ def test_success_returns_octet_stream(flask_test_client, monkeypatch):
         + struct.pack("<dd", 1.0, 0.0)
         + struct.pack("<dd", 0.0, 1.0)
     )
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(200, payload)
         # triangulation retourne 1 triangle
         monkeypatch.setattr("TP.Code.triangulation.triangulate", lambda pts: [(0, 1, 2)])
@@ -141,7 +143,7 @@ def test_triangulation_valueerror_returns_422(flask_test_client, monkeypatch):
         + struct.pack("<dd", 1.0, 1.0)
         + struct.pack("<dd", 2.0, 2.0)
     )
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(200, payload)
         monkeypatch.setattr("TP.Code.triangulation.triangulate", lambda pts: (_ for _ in ()).throw(ValueError("All points are colinear")))
         resp = client.get("/triangulate/8")
@@ -149,7 +151,7 @@ def test_triangulation_valueerror_returns_422(flask_test_client, monkeypatch):
         assert b"All points are colinear" in resp.data
 
 def test_serialization_generic_error_returns_500(flask_test_client, monkeypatch):
-    """Exception générique dans triangles_to_bytes -> 500."""
+    """Exception générique dans iter_triangles_bytes -> 500."""
     client = flask_test_client
     import struct
     payload = (
@@ -158,10 +160,10 @@ def test_serialization_generic_error_returns_500(flask_test_client, monkeypatch)
         + struct.pack("<dd", 1.0, 0.0)
         + struct.pack("<dd", 0.0, 1.0)
     )
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(200, payload)
         monkeypatch.setattr("TP.Code.triangulation.triangulate", lambda pts: [(0, 1, 2)])
-        monkeypatch.setattr("TP.Code.serializers.triangles_to_bytes", lambda *args, **kwargs: (_ for _ in ()).throw(Exception("serialize-error")))
+        monkeypatch.setattr("TP.Code.serializers.iter_triangles_bytes", lambda *args, **kwargs: (_ for _ in ()).throw(Exception("serialize-error")))
         resp = client.get("/triangulate/9")
         assert resp.status_code == 500
         assert b"Serialization failed" in resp.data
@@ -176,7 +178,7 @@ def test_triangulation_generic_error_returns_500(flask_test_client, monkeypatch)
         + struct.pack("<dd", 1.0, 0.0)
         + struct.pack("<dd", 0.0, 1.0)
     )
-    with patch("requests.get") as mock_get:
+    with patch("requests.Session.get") as mock_get:
         mock_get.return_value = _make_resp(200, payload)
         # Force une Exception générique sur triangulate
         monkeypatch.setattr(
@@ -187,3 +189,429 @@ def test_triangulation_generic_error_returns_500(flask_test_client, monkeypatch)
         assert resp.status_code == 500
         assert b"Triangulation failed" in resp.data
 
+
+def test_success_response_is_streamed(flask_test_client, sample_triangle_pointset_bytes):
+    """La réponse est envoyée en flux, avec une taille annoncée égale au binaire complet."""
+    from TP.Code.serializers import triangles_to_bytes
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        resp = flask_test_client.get("/triangulate/10")
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        expected = triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+        assert resp.data == expected
+        assert resp.headers["Content-Length"] == str(len(expected))
+
+def test_second_request_is_served_from_cache(flask_test_client, sample_triangle_pointset_bytes, monkeypatch):
+    """Un PointSet déjà triangulé est servi depuis le cache, sans trianguler de nouveau."""
+    calls = []
+    from TP.Code import triangulation
+    real_triangulate = triangulation.triangulate
+    monkeypatch.setattr("TP.Code.triangulation.triangulate", lambda pts: calls.append(pts) or real_triangulate(pts))
+
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        first = flask_test_client.get("/triangulate/11")
+        assert first.headers["X-Cache"] == "MISS"
+        # La mise en cache a lieu une fois la réponse entièrement lue
+        assert first.data
+        second = flask_test_client.get("/triangulate/11")
+        assert second.headers["X-Cache"] == "HIT"
+
+    assert second.data == first.data
+    assert len(calls) == 1
+    stats = flask_test_client.get("/cache/stats").get_json()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_compact_format_is_negotiated(flask_test_client, sample_triangle_pointset_bytes):
+    """Le format compact est choisi par l'en-tête Accept ou ?format=, mis en cache à part, et le défaut est inchangé."""
+    from TP.Code.serializers import compact_to_triangles, triangles_to_bytes
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        compact = flask_test_client.get("/triangulate/13", headers={"Accept": "application/vnd.triangulation.compact"})
+        assert compact.status_code == 200
+        assert compact.mimetype == "application/vnd.triangulation.compact"
+        assert compact.headers["Vary"] == "Accept"
+        assert compact_to_triangles(compact.data) == {"nbr_point": 3, "triangles": [(0, 1, 2)]}
+
+        zipped = flask_test_client.get("/triangulate/13?format=compact-zlib")
+        assert zipped.mimetype == "application/vnd.triangulation.compact+zlib"
+        assert compact_to_triangles(zipped.data) == {"nbr_point": 3, "triangles": [(0, 1, 2)]}
+
+        default = flask_test_client.get("/triangulate/13", headers={"Accept": "*/*"})
+        assert default.headers["X-Cache"] == "MISS"
+        assert default.data == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+        again = flask_test_client.get("/triangulate/13?format=compact")
+        assert again.headers["X-Cache"] == "HIT"
+        assert again.data == compact.data
+
+        assert flask_test_client.get("/triangulate/13?format=xml").status_code == 400
+
+def test_disk_store_serves_hits_from_file(flask_test_client, sample_triangle_pointset_bytes, tmp_path, monkeypatch):
+    """Avec le cache sur disque, la réponse est écrite une fois complète puis servie depuis le fichier."""
+    from TP.Code.cache import DiskResultStore
+    store = DiskResultStore(tmp_path, 1024 * 1024)
+    monkeypatch.setattr("TP.Code.app.result_store", store)
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        first = flask_test_client.get("/triangulate/14")
+        assert first.headers["X-Cache"] == "MISS"
+        assert first.data
+        second = flask_test_client.get("/triangulate/14")
+
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["Content-Length"] == str(len(first.data))
+    assert second.data == first.data
+    entries = [p for p in tmp_path.rglob("*") if p.is_file() and not p.parent.name.startswith(".")]
+    assert [p.stat().st_size for p in entries] == [len(first.data)]
+    assert flask_test_client.get("/cache/stats").get_json()["disk"]["hits"] == 1
+
+def test_disk_store_lock_released_before_sending(flask_test_client, sample_triangle_pointset_bytes, tmp_path, monkeypatch):
+    """L'entrée est publiée et son verrou libéré avant l'envoi : un client lent ne bloque pas les autres processus."""
+    from TP.Code.cache import DiskResultStore
+    store = DiskResultStore(tmp_path, 1024 * 1024)
+    monkeypatch.setattr("TP.Code.app.result_store", store)
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        resp = flask_test_client.get("/triangulate/14", buffered=False)
+
+    key = resp.headers["ETag"].strip('"')
+    store.lock(key, timeout=0).release()
+    with store.open(key) as f:
+        assert f.read() == b"".join(resp.response)
+    resp.close()
+
+def test_result_version_changes_cache_key(flask_test_client, sample_triangle_pointset_bytes, monkeypatch):
+    """Une nouvelle RESULT_VERSION ne sert pas les réponses calculées avant elle et change l'ETag."""
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        first = flask_test_client.get("/triangulate/15")
+        monkeypatch.setattr("TP.Code.app.RESULT_VERSION", 2)
+        second = flask_test_client.get("/triangulate/15")
+
+    assert second.headers["X-Cache"] == "MISS"
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+@pytest.mark.parametrize("failing", ["write", "commit"])
+def test_disk_store_failure_keeps_response(flask_test_client, sample_triangle_pointset_bytes, tmp_path, monkeypatch, failing):
+    """Une erreur d'écriture du cache sur disque abandonne l'entrée sans tronquer la réponse."""
+    from TP.Code.cache import DiskResultStore
+    from TP.Code.serializers import triangles_to_bytes
+
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("TP.Code.app.result_store", DiskResultStore(tmp_path, 1024 * 1024))
+    monkeypatch.setattr(f"TP.Code.cache.PendingEntry.{failing}", disk_full)
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        resp = flask_test_client.get("/triangulate/14")
+
+    assert resp.status_code == 200
+    assert resp.data == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    assert [p for p in tmp_path.rglob("*") if p.is_file() and not p.parent.name.startswith(".")] == []
+
+def test_concurrent_requests_are_coalesced(flask_test_client, sample_triangle_pointset_bytes):
+    """Des requêtes simultanées pour le même identifiant ne déclenchent qu'un téléchargement."""
+    import threading
+    import time
+
+    from TP.Code.app import app
+    calls = []
+
+    def slow_get(*args, **kwargs):
+        calls.append(args)
+        time.sleep(0.3)
+        return _make_resp(200, sample_triangle_pointset_bytes)
+
+    results = []
+    def request():
+        with app.test_client() as client:
+            resp = client.get("/triangulate/15")
+            results.append((resp.status_code, resp.data))
+
+    with patch("requests.Session.get", side_effect=slow_get):
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(10)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert len(set(results)) == 1 and results[0][0] == 200
+    assert 'triangulator_coalesced_total{stage="fetch"}' in flask_test_client.get("/metrics").get_data(as_text=True)
+
+def test_etags_upstream_and_client(flask_test_client, sample_triangle_pointset_bytes):
+    """L'ETag amont est renvoyé en If-None-Match (304 réutilise le contenu), et le client reçoit un ETag fort et des 304."""
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes, {"ETag": '"v1"'})
+        first = flask_test_client.get("/triangulate/16")
+        etag = first.headers["ETag"]
+        assert etag.startswith('"') and first.data
+
+        mock_get.return_value = _make_resp(304)
+        second = flask_test_client.get("/triangulate/16")
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert second.status_code == 200
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.headers["ETag"] == etag
+        assert second.data == first.data
+
+        third = flask_test_client.get("/triangulate/16", headers={"If-None-Match": etag})
+        assert third.status_code == 304
+        assert third.data == b""
+        assert third.headers["ETag"] == etag
+
+        compact = flask_test_client.get("/triangulate/16?format=compact", headers={"If-None-Match": etag})
+        assert compact.status_code == 200
+        assert compact.headers["ETag"] != etag
+
+def test_truncated_upstream_body_is_rejected_early(flask_test_client):
+    """Un en-tête incompatible avec Content-Length est refusé (400) sans lire le reste du corps."""
+    import struct
+    body = struct.pack("<I", 1000) + b"\x00" * 160
+    read = []
+
+    def iter_content(chunk_size=1):
+        for i in range(0, len(body), 16):
+            read.append(i)
+            yield body[i:i + 16]
+
+    upstream = _make_resp(200, body, {"Content-Length": str(len(body))})
+    upstream.iter_content.side_effect = iter_content
+    with patch("requests.Session.get", return_value=upstream):
+        resp = flask_test_client.get("/triangulate/17")
+
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "Invalid PointSet format"
+    assert read == [0]
+    upstream.close.assert_called()
+
+def test_post_inline_pointset_skips_upstream(flask_test_client, sample_triangle_pointset_bytes, monkeypatch):
+    """Un POST avec un corps octet-stream est triangulé sans appeler le PointSetManager, avec les mêmes codes d'erreur."""
+    from TP.Code.serializers import triangles_to_bytes
+    octet = {"Content-Type": "application/octet-stream"}
+    with patch("requests.Session.get") as mock_get:
+        resp = flask_test_client.post("/triangulate/18", data=sample_triangle_pointset_bytes, headers=octet)
+        assert resp.status_code == 200
+        assert resp.data == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+        assert "receive;dur=" in resp.headers["Server-Timing"]
+
+        assert flask_test_client.post("/triangulate/18", data=b"\x05\x00", headers=octet).status_code == 400
+        monkeypatch.setattr("TP.Code.app.MAX_INLINE_BYTES", len(sample_triangle_pointset_bytes) - 1)
+        too_large = flask_test_client.post("/triangulate/18", data=sample_triangle_pointset_bytes, headers=octet)
+        assert too_large.status_code == 413
+    mock_get.assert_not_called()
+
+def test_post_matching_etag_is_not_304(flask_test_client, sample_triangle_pointset_bytes):
+    """En POST, un If-None-Match qui correspond au résultat donne 412 et non 304."""
+    octet = {"Content-Type": "application/octet-stream"}
+    first = flask_test_client.post("/triangulate/19", data=sample_triangle_pointset_bytes, headers=octet)
+    etag = first.headers["ETag"]
+
+    resp = flask_test_client.post("/triangulate/19", data=sample_triangle_pointset_bytes,
+                                  headers={**octet, "If-None-Match": etag})
+    assert resp.status_code == 412
+    assert resp.headers["ETag"] == etag
+    assert resp.get_json()["error"] == "Precondition failed"
+
+def test_changed_pointset_is_not_served_stale(flask_test_client, sample_triangle_pointset_bytes):
+    """Un contenu différent sous le même identifiant n'est pas servi depuis le cache."""
+    import struct
+    other = struct.pack("<I", 3) + struct.pack("<dddddd", 0.0, 0.0, 2.0, 0.0, 0.0, 2.0)
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        first = flask_test_client.get("/triangulate/12")
+        assert first.data
+        mock_get.return_value = _make_resp(200, other)
+        second = flask_test_client.get("/triangulate/12")
+
+    assert second.headers["X-Cache"] == "MISS"
+    assert second.data != first.data
+
+def test_gzip_upstream_is_accepted(flask_test_client, pointset_manager_server, sample_triangle_pointset_bytes, monkeypatch):
+    """Un PointSet compressé par le PointSetManager (Content-Length compressé, plus petit) est décodé normalement."""
+    from TP.Code.serializers import triangles_to_bytes
+    from TP.Code.upstream import PointSetClient
+    pointset_manager_server.gzip = True
+    pointset_manager_server.routes["gz"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    monkeypatch.setattr("TP.Code.app.pointset_client", PointSetClient(pointset_manager_server.url))
+
+    resp = flask_test_client.get("/triangulate/gz")
+    assert resp.status_code == 200
+    assert resp.data == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+def test_batch_returns_one_status_per_item(flask_test_client, pointset_manager_server, sample_triangle_pointset_bytes, monkeypatch):
+    """Le lot renvoie un statut par PointSet, dans l'ordre, sans échouer sur un élément invalide."""
+    from TP.Code.serializers import bytes_to_batch, triangles_to_bytes
+    from TP.Code.upstream import PointSetClient
+
+    pointset_manager_server.routes["ok"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    pointset_manager_server.routes["bad"] = [(200, b"\x00\x01", 0.0)]
+    monkeypatch.setattr("TP.Code.app.pointset_client", PointSetClient(pointset_manager_server.url))
+
+    resp = flask_test_client.post("/batch/triangulate", json={"pointset_ids": ["ok", "absent", "bad", "ok"]})
+    assert resp.status_code == 200
+    items = bytes_to_batch(resp.data)
+    assert [status for status, _ in items] == [200, 404, 400, 200]
+    expected = triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    assert items[0][1] == expected
+    assert items[3][1] == expected
+    assert b"PointSet not found" in items[1][1]
+
+def test_batch_item_error_is_a_500_frame(flask_test_client, monkeypatch):
+    """Une exception inattendue pendant la récupération donne un élément 500 sans tronquer le lot."""
+    from TP.Code.serializers import bytes_to_batch
+
+    def fetch(pointset_id):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("TP.Code.app._fetch", fetch)
+    resp = flask_test_client.post("/batch/triangulate", json={"pointset_ids": ["a", "b"]})
+
+    items = bytes_to_batch(resp.data)
+    assert [status for status, _ in items] == [500, 500]
+    assert b"Internal error" in items[1][1]
+
+def test_batch_keeps_a_bounded_window(flask_test_client, monkeypatch):
+    """Le lot ne soumet que BATCH_CONCURRENCY éléments en avance sur celui envoyé, dans l'ordre de la requête."""
+    from TP.Code.app import _batch_results
+
+    started = []
+
+    def item(pointset_id):
+        started.append(pointset_id)
+        return 200, pointset_id.encode()
+
+    monkeypatch.setattr("TP.Code.app.BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr("TP.Code.app._batch_item", item)
+    ids = [str(i) for i in range(10)]
+    results = _batch_results(ids)
+    for sent, (status, body) in enumerate(results, start=1):
+        assert (status, body) == (200, ids[sent - 1].encode())
+        assert len(started) <= sent + 2
+    assert started == ids
+
+@pytest.mark.parametrize("body", [None, {"ids": ["1"]}, {"pointset_ids": "1"}, {"pointset_ids": [1, 2]}])
+def test_batch_invalid_request_returns_400(flask_test_client, body):
+    """Un corps de lot mal formé est refusé avec 400."""
+    resp = flask_test_client.post("/batch/triangulate", json=body)
+    assert resp.status_code == 400
+
+
+def test_insertion_de_points_renvoie_le_maillage_ou_le_delta(flask_test_client, sample_triangle_pointset_bytes):
+    """Les points envoyés sont insérés dans le maillage conservé, le PointSet n'étant que revalidé (304)."""
+    import struct
+
+    from TP.Code.serializers import bytes_to_delta, triangles_to_bytes
+
+    with patch("requests.Session.get") as mock_get:
+        mock_get.side_effect = [_make_resp(200, sample_triangle_pointset_bytes, {"ETag": '"v1"'}), _make_resp(304)]
+        body = struct.pack("<I", 1) + struct.pack("<dd", 1.0, 1.0)
+        first = flask_test_client.post("/triangulate/20/points", data=body)
+        assert first.status_code == 200
+        points = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0)]
+        assert first.data == triangles_to_bytes(2, [(0, 1, 2), (1, 2, 3)], 4, points)
+
+        body = struct.pack("<I", 1) + struct.pack("<dd", 0.2, 0.2)
+        second = flask_test_client.post("/triangulate/20/points?delta=1", data=body)
+        assert mock_get.call_count == 2
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    assert second.status_code == 200
+    removed, added = bytes_to_delta(second.data)
+    assert removed == [(0, 1, 2), (1, 2, 3)]
+    assert added == [(0, 1, 4), (0, 2, 4), (1, 3, 4), (2, 3, 4)]
+
+def test_insertion_de_points_apres_modification_en_amont(flask_test_client, sample_triangle_pointset_bytes):
+    """Un PointSet modifié en amont remplace le maillage conservé au lieu de recevoir les points."""
+    import struct
+
+    from TP.Code.serializers import triangles_to_bytes
+
+    moved = struct.pack("<I", 3) + struct.pack("<6d", 0.0, 0.0, 2.0, 0.0, 0.0, 2.0)
+    body = struct.pack("<I", 1) + struct.pack("<dd", 1.0, 1.0)
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        assert flask_test_client.post("/triangulate/23/points", data=body).status_code == 200
+        mock_get.return_value = _make_resp(200, moved)
+        resp = flask_test_client.post("/triangulate/23/points", data=body)
+
+    assert resp.status_code == 200
+    points = [(0.0, 0.0), (2.0, 0.0), (0.0, 2.0), (1.0, 1.0)]
+    assert resp.data == triangles_to_bytes(2, [(0, 1, 3), (0, 2, 3)], 4, points)
+
+def test_insertion_de_points_deja_ajoutes_en_amont(flask_test_client, sample_triangle_pointset_bytes):
+    """Un producteur qui ajoute ses points en amont puis les envoie reçoit le delta de ces seuls points."""
+    import struct
+
+    from TP.Code.serializers import bytes_to_delta
+
+    def pointset(*points):
+        return struct.pack("<I", len(points)) + b"".join(struct.pack("<dd", x, y) for x, y in points)
+
+    triangle = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)]
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        assert flask_test_client.post("/triangulate/25/points", data=pointset((1.0, 1.0))).status_code == 200
+
+        mock_get.return_value = _make_resp(200, pointset(*triangle, (1.0, 1.0), (0.2, 0.2)))
+        resp = flask_test_client.post("/triangulate/25/points?delta=1", data=pointset((0.2, 0.2)))
+
+    assert resp.status_code == 200
+    removed, added = bytes_to_delta(resp.data)
+    assert removed == [(0, 1, 2), (1, 2, 3)]
+    assert added == [(0, 1, 4), (0, 2, 4), (1, 3, 4), (2, 3, 4)]
+
+def test_insertion_de_points_trop_nombreux(flask_test_client, monkeypatch):
+    """Un corps plus grand que MAX_INLINE_BYTES est refusé avec 413, sans interroger le PointSetManager."""
+    import struct
+    monkeypatch.setattr("TP.Code.app.MAX_INLINE_BYTES", 100)
+    body = struct.pack("<I", 10) + struct.pack("<20d", *range(20))
+    with patch("requests.Session.get") as mock_get:
+        resp = flask_test_client.post("/triangulate/24/points", data=body)
+        mock_get.assert_not_called()
+    assert resp.status_code == 413
+
+def test_insertion_de_points_invalides(flask_test_client, sample_triangle_pointset_bytes):
+    """Un corps illisible donne 400, un point déjà présent 422, un PointSet absent 404."""
+    import struct
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        assert flask_test_client.post("/triangulate/21/points", data=b"\x01").status_code == 400
+        duplicate = struct.pack("<I", 1) + struct.pack("<dd", 1.0, 0.0)
+        resp = flask_test_client.post("/triangulate/21/points", data=duplicate)
+        assert resp.status_code == 422
+        assert b"Duplicate points found" in resp.data
+
+        mock_get.return_value = _make_resp(404)
+        assert flask_test_client.post("/triangulate/22/points", data=duplicate).status_code == 404
+
+def test_server_timing_et_metriques(flask_test_client, sample_triangle_pointset_bytes):
+    """La réponse détaille la durée de chaque phase et /metrics expose histogrammes et compteurs."""
+    from TP.Code.app import service_metrics
+    endpoint = "/triangulate/<pointset_id>"
+    # Les réponses des autres tests ne sont pas toutes fermées : on compare à la valeur de départ
+    in_flight = service_metrics.in_flight.value(endpoint)
+    with patch("requests.Session.get") as mock_get:
+        mock_get.return_value = _make_resp(200, sample_triangle_pointset_bytes)
+        resp = flask_test_client.get("/triangulate/30")
+        assert resp.data
+        resp.close()
+
+    phases = [entry.split(";")[0] for entry in resp.headers["Server-Timing"].split(", ")]
+    assert phases == ["fetch", "cache", "parse", "triangulate", "serialize"]
+
+    metrics = flask_test_client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["Content-Type"].startswith("text/plain")
+    text = metrics.get_data(as_text=True)
+    assert 'triangulator_phase_seconds_count{phase="triangulate"}' in text
+    assert 'triangulator_phase_seconds_count{phase="serialize"}' in text
+    assert 'triangulator_input_points_bucket{le="10"}' in text
+    assert 'triangulator_responses_total{endpoint="/triangulate/<pointset_id>",status="200"}' in text
+    assert f'triangulator_in_flight_requests{{endpoint="{endpoint}"}}' in text
+    assert service_metrics.in_flight.value(endpoint) == in_flight
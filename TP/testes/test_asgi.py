@@ -0,0 +1,184 @@
+"""Tests de la variante ASGI du service, contre un faux PointSetManager local."""
+
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+# La variante ASGI lit le PointSetManager avec httpx (requirements.txt)
+pytest.importorskip("httpx")
+
+from TP.Code.asgi import TriangulationApp  # noqa: E402
+from TP.Code.executor import TriangulationExecutor  # noqa: E402
+from TP.Code.serializers import triangles_to_bytes  # noqa: E402
+from TP.Code.upstream import AsyncPointSetClient  # noqa: E402
+
+
+async def _request(app, path, method="GET"):
+    """Appelle l'application ASGI et renvoie (status, en-têtes, corps)."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "method": method, "path": path, "headers": []}, receive, send)
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return start["status"], dict(start["headers"]), body
+
+
+def _call(app, path, method="GET"):
+    """Version synchrone de _request."""
+    return asyncio.run(_request(app, path, method))
+
+
+@pytest.fixture
+def asgi_app(pointset_manager_server):
+    """Application ASGI branchée sur le faux PointSetManager."""
+    client = AsyncPointSetClient(pointset_manager_server.url, retries=0)
+    return TriangulationApp(client=client, executor=TriangulationExecutor())
+
+
+def test_asgi_succes(asgi_app, pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie que la réponse binaire est identique à celle de l'application Flask."""
+    pointset_manager_server.routes["1"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    status, headers, body = _call(asgi_app, "/triangulate/1")
+    assert status == 200
+    assert headers[b"content-type"] == b"application/octet-stream"
+    assert body == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    assert int(headers[b"content-length"]) == len(body)
+
+@pytest.mark.parametrize("payload, expected", [
+    (b"\x00\x01", 400),
+    (struct.pack("<I", 3) + struct.pack("<dddddd", 0.0, 0.0, 1.0, 1.0, 2.0, 2.0), 422),
+])
+def test_asgi_erreurs_de_donnees(asgi_app, pointset_manager_server, payload, expected):
+    """Vérifie les codes 400 (format invalide) et 422 (points non triangulables)."""
+    pointset_manager_server.routes["2"] = [(200, payload, 0.0)]
+    status, headers, body = _call(asgi_app, "/triangulate/2")
+    assert status == expected
+    assert "error" in json.loads(body)
+
+def test_asgi_pointset_absent(asgi_app):
+    """Vérifie qu'un PointSet inconnu du PointSetManager donne 404."""
+    assert _call(asgi_app, "/triangulate/absent")[0] == 404
+
+def test_asgi_pointset_manager_injoignable():
+    """Vérifie qu'un PointSetManager injoignable donne 503."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    app = TriangulationApp(client=AsyncPointSetClient(f"http://127.0.0.1:{port}/pointsets", retries=0),
+                           executor=TriangulationExecutor())
+    status, headers, body = _call(app, "/triangulate/1")
+    assert status == 503
+    assert json.loads(body)["error"] == "External service unavailable"
+
+def test_asgi_echec_de_triangulation(asgi_app, pointset_manager_server, sample_triangle_pointset_bytes, monkeypatch):
+    """Vérifie qu'une exception inattendue de triangulation donne 500."""
+    pointset_manager_server.routes["3"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    monkeypatch.setattr("TP.Code.triangulation.triangulate", lambda pts: (_ for _ in ()).throw(Exception("boom")))
+    status, headers, body = _call(asgi_app, "/triangulate/3")
+    assert status == 500
+    assert json.loads(body)["error"] == "Triangulation failed"
+
+def test_asgi_routes_inconnues(asgi_app):
+    """Vérifie les réponses 404 et 405 hors du contrat."""
+    assert _call(asgi_app, "/autre")[0] == 404
+    assert _call(asgi_app, "/triangulate/1", method="DELETE")[0] == 405
+
+def test_asgi_requetes_concurrentes_vers_un_pointset_manager_lent(asgi_app, pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie que 20 requêtes vers un PointSetManager lent sont traitées en parallèle dans un seul thread."""
+    pointset_manager_server.routes["lent"] = [(200, sample_triangle_pointset_bytes, 0.3)]
+
+    async def run_all():
+        return await asyncio.gather(*(_request(asgi_app, "/triangulate/lent") for _ in range(20)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+
+    assert all(status == 200 for status, _, _ in results)
+    assert elapsed < 20 * 0.3 / 2
+
+
+def test_asgi_connexion_fermee_sans_reponse():
+    """Vérifie qu'un PointSetManager qui ferme la connexion sans répondre donne 503, après les reprises."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    accepted = []
+
+    def close_without_reply():
+        for _ in range(2):
+            conn, _ = listener.accept()
+            accepted.append(conn)
+            conn.recv(4096)
+            conn.close()
+
+    thread = threading.Thread(target=close_without_reply, daemon=True)
+    thread.start()
+    port = listener.getsockname()[1]
+    client = AsyncPointSetClient(f"http://127.0.0.1:{port}/pointsets", retries=1, backoff_factor=0.0)
+    try:
+        status, headers, body = _call(TriangulationApp(client=client, executor=TriangulationExecutor()), "/triangulate/1")
+    finally:
+        thread.join(5)
+        listener.close()
+    assert status == 503
+    assert "RemoteProtocolError" in json.loads(body)["details"]
+    assert len(accepted) == 2
+
+def test_asgi_identifiant_encode(asgi_app, pointset_manager_server):
+    """Vérifie que l'identifiant est encodé dans l'URL amont au lieu de casser la ligne de requête."""
+    assert _call(asgi_app, "/triangulate/a b?c#d")[0] == 404
+    assert pointset_manager_server.requests == ["a%20b%3Fc%23d"]
+
+
+def test_asgi_morceaux_produits_hors_de_la_boucle(asgi_app, pointset_manager_server, sample_triangle_pointset_bytes, monkeypatch):
+    """Vérifie que tous les morceaux de la réponse sont produits dans le pool de threads, pas dans la boucle."""
+    from TP.Code import pipeline
+    real_encode = pipeline.encode
+    threads = []
+
+    def encode(*args):
+        size, chunks = real_encode(*args)
+
+        def tracked():
+            for chunk in chunks:
+                threads.append(threading.current_thread())
+                yield chunk
+        return size, tracked()
+
+    monkeypatch.setattr("TP.Code.pipeline.encode", encode)
+    pointset_manager_server.routes["3"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    status, headers, body = _call(asgi_app, "/triangulate/3")
+    assert status == 200
+    assert body == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    assert len(threads) > 1
+    assert threading.main_thread() not in threads
+
+
+def test_asgi_pointset_compresse(asgi_app, pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie qu'un corps gzip est décompressé avant d'être décodé en flux."""
+    pointset_manager_server.gzip = True
+    pointset_manager_server.routes["gz"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    status, headers, body = _call(asgi_app, "/triangulate/gz")
+    assert status == 200
+    assert body == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+def test_asgi_pointset_trop_grand(pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie qu'un PointSet plus grand que max_bytes est refusé (503) sans être retenté."""
+    pointset_manager_server.routes["1"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    client = AsyncPointSetClient(pointset_manager_server.url, retries=2, max_bytes=20)
+    status, headers, body = _call(TriangulationApp(client=client, executor=TriangulationExecutor()), "/triangulate/1")
+    assert status == 503
+    assert "larger than 20 bytes" in json.loads(body)["details"]
+    assert pointset_manager_server.requests == ["1"]
@@ -0,0 +1,101 @@
+"""Tests du banc de mesure : statistiques, détection de régression et aller-retour JSON."""
+
+import pytest
+
+from TP.Code.bench import (
+    DISTRIBUTIONS,
+    compare,
+    generate,
+    load,
+    main,
+    mann_whitney_greater,
+    median,
+    min_p_value,
+    percentile,
+    run,
+    save,
+)
+
+
+def test_statistiques_de_base():
+    """Vérifie la médiane et le centile par rang le plus proche."""
+    samples = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert median(samples) == 3.0
+    assert median([1.0, 2.0, 3.0, 4.0]) == 2.5
+    assert percentile(samples, 95) == 5.0
+    assert percentile(samples, 50) == 3.0
+
+def test_mann_whitney_exact():
+    """Vérifie les p-valeurs extrêmes du test exact sur deux échantillons de 5 mesures."""
+    slow = [2.0, 2.1, 2.2, 2.3, 2.4]
+    fast = [1.0, 1.1, 1.2, 1.3, 1.4]
+    assert mann_whitney_greater(slow, fast) == pytest.approx(1 / 252)
+    assert mann_whitney_greater(fast, slow) == 1.0
+
+def test_compare_ne_signale_que_les_ralentissements_significatifs():
+    """Vérifie qu'un ralentissement net est signalé, mais pas le bruit ni une accélération."""
+    def result(samples):
+        return {"samples": samples, "median": median(samples)}
+
+    baseline = {
+        "a": result([1.0, 1.01, 0.99, 1.02, 0.98]),
+        "b": result([1.0, 1.01, 0.99, 1.02, 0.98]),
+        "c": result([1.0, 1.01, 0.99, 1.02, 0.98]),
+    }
+    current = {
+        "a": result([2.0, 2.02, 1.98, 2.01, 1.99]),
+        "b": result([1.0, 1.03, 0.97, 1.01, 0.99]),
+        "c": result([0.5, 0.51, 0.49, 0.5, 0.5]),
+        "new": result([1.0]),
+    }
+    regressions = compare(current, baseline)
+    assert [r["name"] for r in regressions] == ["a"]
+    assert regressions[0]["ratio"] == pytest.approx(2.0, rel=0.01)
+
+def test_compare_refuse_un_seuil_inatteignable():
+    """Vérifie qu'une comparaison qui ne pourrait jamais être significative est refusée."""
+    assert min_p_value(5, 5) == pytest.approx(1 / 252)
+    assert min_p_value(4, 4) == pytest.approx(1 / 70)
+    slow = {"a": {"samples": [2.0, 2.1, 2.2, 2.3], "median": 2.15}}
+    fast = {"a": {"samples": [1.0, 1.1, 1.2, 1.3], "median": 1.15}}
+    with pytest.raises(ValueError, match="cannot reach alpha=0.01"):
+        compare(slow, fast)
+    assert [r["name"] for r in compare(slow, fast, alpha=0.05)] == ["a"]
+
+@pytest.mark.parametrize("distribution", sorted(DISTRIBUTIONS))
+def test_distributions_points_distincts(distribution):
+    """Vérifie que chaque distribution produit des points distincts et reproductibles."""
+    points = generate(distribution, 500)
+    assert len(points) == len(set(points)) > 400
+    assert generate(distribution, 500) == points
+
+def test_run_et_aller_retour_json(tmp_path):
+    """Vérifie qu'un petit banc mesure chaque phase et se relit à l'identique."""
+    results = run(sizes=(50,), distributions=("uniform",), repeat=2, warmup=0)
+    assert sorted(results) == [
+        "bytes_to_pointset/uniform/50",
+        "triangles_to_bytes/uniform/50",
+        "triangulate/uniform/50",
+    ]
+    assert all(len(r["samples"]) == 2 and r["peak_bytes"] > 0 for r in results.values())
+    path = tmp_path / "baseline.json"
+    save(results, path)
+    assert load(path) == results
+
+def test_main_echoue_sur_regression(tmp_path, capsys):
+    """Vérifie que la ligne de commande renvoie 1 quand la référence était bien plus rapide."""
+    path = tmp_path / "baseline.json"
+    args = ["--sizes", "50", "--distributions", "uniform", "--phases", "triangulate", "--repeat", "5", "--warmup", "0", "--no-memory"]
+    assert main([*args, "--output", str(path)]) == 0
+    reference = load(path)
+    for r in reference.values():
+        r["samples"] = [s / 1000 for s in r["samples"]]
+        r["median"] /= 1000
+    save(reference, path)
+    assert main([*args, "--compare", str(path)]) == 1
+    assert main([*args, "--compare", str(tmp_path / "absent.json")]) == 0
+
+    few = [*args[:6], "--repeat", "3", *args[8:]]
+    with pytest.raises(SystemExit):
+        main([*few, "--compare", str(path)])
+    assert "cannot reach --alpha 0.01" in capsys.readouterr().err
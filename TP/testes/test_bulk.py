@@ -0,0 +1,60 @@
+"""Tests de la triangulation hors ligne de fichiers PointSet."""
+
+import struct
+
+from TP.Code.bulk import collect, main, triangulate_file
+from TP.Code.serializers import bytes_to_pointset, triangles_to_bytes
+from TP.Code.triangulation import triangulate
+
+
+def _pointset_bytes(points):
+    return struct.pack('<I', len(points)) + struct.pack(f'<{2 * len(points)}d', *(c for p in points for c in p))
+
+SQUARE = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0), (0.4, 0.6)]
+
+
+def test_triangulate_file_ecrit_le_format_triangles(tmp_path):
+    """Vérifie que la sortie est celle de triangles_to_bytes et qu'aucun fichier temporaire ne reste."""
+    src = tmp_path / "carre.bin"
+    src.write_bytes(_pointset_bytes(SQUARE))
+    dst = tmp_path / "sorties" / "carre.bin.triangles"
+
+    assert triangulate_file(str(src), str(dst)) == (5, 4)
+    points = bytes_to_pointset(_pointset_bytes(SQUARE))["points"]
+    triangles = triangulate(points)
+    assert dst.read_bytes() == bytes(triangles_to_bytes(len(triangles), triangles, len(points), points))
+    assert [p.name for p in dst.parent.iterdir()] == ["carre.bin.triangles"]
+
+def test_collect_reproduit_l_arborescence(tmp_path):
+    """Vérifie les chemins de sortie des fichiers isolés et des répertoires parcourus."""
+    (tmp_path / "in" / "sous").mkdir(parents=True)
+    (tmp_path / "in" / "a.bin").write_bytes(b"")
+    (tmp_path / "in" / "sous" / "b.bin").write_bytes(b"")
+    (tmp_path / "in" / "sous" / "b.bin.triangles").write_bytes(b"")
+    (tmp_path / "seul.bin").write_bytes(b"")
+
+    jobs = collect([tmp_path / "in", tmp_path / "seul.bin"], tmp_path / "out")
+    assert [(src.relative_to(tmp_path).as_posix(), dst.relative_to(tmp_path).as_posix()) for src, dst in jobs] == [
+        ("in/a.bin", "out/a.bin.triangles"),
+        ("in/sous/b.bin", "out/sous/b.bin.triangles"),
+        ("seul.bin", "out/seul.bin.triangles"),
+    ]
+
+def test_main_signale_les_erreurs_et_reprend(tmp_path, capsys):
+    """Vérifie qu'un fichier invalide est signalé sans bloquer les autres, puis que la reprise saute les sorties faites."""
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    (inputs / "a.bin").write_bytes(_pointset_bytes(SQUARE))
+    (inputs / "b.bin").write_bytes(_pointset_bytes(SQUARE[:3]))
+    (inputs / "vide.bin").write_bytes(b"")
+    out = tmp_path / "out"
+
+    assert main([str(inputs), "-o", str(out), "--workers", "1", "--progress", "0"]) == 1
+    captured = capsys.readouterr()
+    assert "FAILED" in captured.err and "vide.bin" in captured.err
+    assert "2 triangulated, 0 skipped, 1 failed" in captured.out
+    assert sorted(p.name for p in out.iterdir()) == ["a.bin.triangles", "b.bin.triangles"]
+
+    (inputs / "vide.bin").write_bytes(_pointset_bytes(SQUARE))
+    assert main([str(inputs), "-o", str(out), "--workers", "1", "--progress", "0"]) == 0
+    assert "1 triangulated, 2 skipped, 0 failed" in capsys.readouterr().out
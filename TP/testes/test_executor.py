@@ -0,0 +1,110 @@
+"""Tests de l'exécution de la triangulation dans un pool de processus."""
+
+import os
+import random
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from TP.Code.executor import TriangulationExecutor, TriangulationTimeout, WorkerCrashed
+from TP.Code.serializers import bytes_to_pointset
+
+
+def _pointset_bytes(points):
+    """Encode une liste de points au format PointSet."""
+    return struct.pack('<I', len(points)) + b"".join(struct.pack('<dd', x, y) for x, y in points)
+
+
+@pytest.fixture
+def process_executor():
+    """Exécuteur en mode processus avec deux processus."""
+    executor = TriangulationExecutor(mode="process", workers=2, timeout=30.0)
+    yield executor
+    executor.shutdown()
+
+
+def test_mode_processus_identique_au_mode_en_ligne(process_executor):
+    """Vérifie que le pool de processus renvoie les mêmes triangles que l'exécution en ligne."""
+    rnd = random.Random(8)
+    raw = _pointset_bytes([(rnd.random(), rnd.random()) for _ in range(300)])
+    points = bytes_to_pointset(raw)["points"]
+
+    n_inline, inline = TriangulationExecutor().triangulate(raw, points)
+    n_process, flat = process_executor.triangulate(raw, points)
+
+    assert n_process == n_inline
+    assert set(zip(flat[0::3], flat[1::3], flat[2::3], strict=True)) == set(inline)
+
+def test_mode_processus_propage_valueerror(process_executor):
+    """Vérifie qu'une erreur métier levée dans un processus est propagée telle quelle."""
+    raw = _pointset_bytes([(0.0, 0.0), (1.0, 1.0), (2.0, 2.0)])
+    with pytest.raises(ValueError, match="All points are colinear"):
+        process_executor.triangulate(raw, bytes_to_pointset(raw)["points"])
+
+def test_delai_depasse_puis_reprise():
+    """Vérifie qu'une tâche trop longue est abandonnée et que le pool suivant fonctionne."""
+    executor = TriangulationExecutor(mode="process", workers=1, timeout=0.5)
+    try:
+        rnd = random.Random(9)
+        big = _pointset_bytes([(rnd.random(), rnd.random()) for _ in range(200000)])
+        with pytest.raises(TriangulationTimeout):
+            executor.triangulate(big, bytes_to_pointset(big)["points"])
+
+        executor.timeout = 30.0
+        small = _pointset_bytes([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+        assert executor.triangulate(small, bytes_to_pointset(small)["points"])[0] == 1
+    finally:
+        executor.shutdown()
+
+def test_attente_en_file_hors_delai():
+    """Vérifie que l'attente d'un processus libre ne compte pas dans le délai d'une tâche."""
+    executor = TriangulationExecutor(mode="process", workers=1, timeout=1.0)
+    try:
+        with ThreadPoolExecutor(3) as threads:
+            futures = [threads.submit(executor.run, time.sleep, 0.6) for _ in range(3)]
+            assert [f.result() for f in futures] == [None, None, None]
+    finally:
+        executor.shutdown()
+
+def test_delai_n_arrete_pas_le_processus():
+    """Vérifie qu'une tâche hors délai est interrompue dans son processus, sans remplacer le pool."""
+    executor = TriangulationExecutor(mode="process", workers=1, timeout=0.5)
+    try:
+        executor.run(time.sleep, 0)
+        pool = executor._pool
+        with pytest.raises(TriangulationTimeout):
+            executor.run(time.sleep, 5)
+        assert executor._pool is pool
+        assert executor.run(time.sleep, 0) is None
+    finally:
+        executor.shutdown()
+
+def test_processus_tue_puis_reprise(process_executor):
+    """Vérifie qu'un processus qui meurt est signalé et que le pool est remplacé."""
+    with pytest.raises(WorkerCrashed):
+        process_executor.run(os._exit, 1)
+
+    raw = _pointset_bytes([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    assert process_executor.triangulate(raw, bytes_to_pointset(raw)["points"])[0] == 1
+
+def test_mode_inconnu():
+    """Vérifie qu'un mode d'exécution inconnu est refusé."""
+    with pytest.raises(ValueError, match="Unknown executor mode"):
+        TriangulationExecutor(mode="gpu")
+
+def test_endpoint_en_mode_processus(flask_test_client, sample_triangle_pointset_bytes, process_executor, monkeypatch):
+    """Vérifie que l'endpoint renvoie le même binaire quand la triangulation passe par le pool."""
+    from unittest.mock import Mock, patch
+
+    from TP.Code.serializers import triangles_to_bytes
+
+    upstream = Mock(status_code=200, content=sample_triangle_pointset_bytes, headers={})
+    upstream.iter_content.return_value = iter([sample_triangle_pointset_bytes])
+    monkeypatch.setattr("TP.Code.app.triangulation_executor", process_executor)
+    with patch("requests.Session.get", return_value=upstream):
+        resp = flask_test_client.get("/triangulate/13")
+
+    assert resp.status_code == 200
+    assert resp.data == triangles_to_bytes(1, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
@@ -0,0 +1,49 @@
+"""Tests unitaires des métriques et du chronométrage des phases."""
+
+from TP.Code.metrics import Counter, Gauge, Histogram, PhaseTimer
+
+
+def test_histogramme_cumule_les_compteurs():
+    """Vérifie le format d'exposition d'un histogramme étiqueté."""
+    h = Histogram("demo_seconds", "Demo.", (0.1, 1.0), ("phase",))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        h.observe(value, "parse")
+    lines = h.render()
+    assert lines[:2] == ["# HELP demo_seconds Demo.", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{phase="parse",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{phase="parse",le="1.0"} 3' in lines
+    assert 'demo_seconds_bucket{phase="parse",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{phase="parse"} 3.65' in lines
+    assert 'demo_seconds_count{phase="parse"} 4' in lines
+
+def test_compteur_et_jauge():
+    """Vérifie les compteurs par étiquettes et l'échappement des valeurs."""
+    c = Counter("demo_total", "Demo.", ("status",))
+    c.inc("200")
+    c.inc("200")
+    c.inc('a"b')
+    assert c.value("200") == 2
+    assert 'demo_total{status="a\\"b"} 1' in c.render()
+
+    gauge = Gauge("demo_in_flight", "Demo.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert gauge.render()[-1] == "demo_in_flight 1"
+
+def test_chronometrage_des_phases():
+    """Vérifie l'en-tête Server-Timing et la durée complète d'une phase envoyée en flux."""
+    h = Histogram("demo_phase_seconds", "Demo.", (1.0,), ("phase",))
+    timer = PhaseTimer(h)
+    with timer.phase("fetch"):
+        pass
+    with timer.phase("serialize", observe=False):
+        pass
+    assert h.count("fetch") == 1
+    assert h.count("serialize") == 0
+    header = timer.header()
+    assert header.startswith("fetch;dur=")
+    assert ", serialize;dur=" in header
+
+    assert list(timer.stream(iter([b"a", b"b"]), "serialize")) == [b"a", b"b"]
+    assert h.count("serialize") == 1
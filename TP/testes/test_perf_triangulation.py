@@ -1,6 +1,7 @@
 # pragma: no cover
 """Tests de performance pour la triangulation."""
 
+import os
 import random
 import time
 
@@ -44,4 +45,35 @@ def test_triangulation_time_large():
     elapsed = time.perf_counter() - start
     
     # Seuil indicatif, à ajuster selon la machine
-    assert elapsed < 200.0, f"Triangulation large ({N} pts) trop lente: {elapsed:.2f}s"
\ No newline at end of file
+    assert elapsed < 200.0, f"Triangulation large ({N} pts) trop lente: {elapsed:.2f}s"
+
+@pytest.mark.perf
+def test_triangulation_time_large_brio():
+    """Test de performance pour la triangulation incrémentale de 50000 points dans l'ordre BRIO."""
+    random.seed(2)
+    N = 50000
+    pts = [(random.random()*1000.0, random.random()*1000.0) for _ in range(N)]
+
+    start = time.perf_counter()
+    triangulate(pts, method="bowyer-watson", insertion_order="brio")
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 60.0, f"Triangulation BRIO ({N} pts) trop lente: {elapsed:.2f}s"
+
+@pytest.mark.perf
+def test_triangulation_parallele_acceleration():
+    """Mesure l'accélération de diviser pour régner en fonction du nombre de processus (200000 points)."""
+    random.seed(3)
+    N = 200000
+    pts = [(random.random()*1000.0, random.random()*1000.0) for _ in range(N)]
+
+    timings = {}
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        triangulate(pts, method="divide-and-conquer", workers=workers)
+        timings[workers] = time.perf_counter() - start
+        print(f"{workers} processus : {timings[workers]:.2f}s (x{timings[1] / timings[workers]:.2f})")
+
+    # L'accélération n'est exigée que si la machine a assez de cœurs
+    if (os.cpu_count() or 1) >= 4:
+        assert timings[4] < timings[1], f"Pas d'accélération avec 4 processus : {timings}"
@@ -0,0 +1,167 @@
+"""Tests unitaires pour le cache de résultats."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from TP.Code.cache import DiskResultStore, MeshStore, ResultCache, SingleFlight, content_key
+
+
+def test_cache_hit_et_miss():
+    """Vérifie qu'une valeur stockée est relue et que les compteurs sont tenus."""
+    cache = ResultCache(100)
+    assert cache.get("a") is None
+    cache.put("a", b"x" * 10)
+    assert cache.get("a") == b"x" * 10
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes"] == 10
+
+def test_cache_eviction_par_octets():
+    """Vérifie que l'éviction se fait selon la taille totale, en commençant par la moins récente."""
+    cache = ResultCache(100)
+    cache.put("a", b"a" * 40)
+    cache.put("b", b"b" * 40)
+    cache.get("a")
+    cache.put("c", b"c" * 40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 80
+
+def test_cache_valeur_trop_grande():
+    """Vérifie qu'une valeur plus grande que le cache n'est pas stockée."""
+    cache = ResultCache(10)
+    assert cache.put("a", b"a" * 11) is False
+    assert cache.stats()["entries"] == 0
+
+def test_content_key_depend_du_contenu():
+    """Vérifie que la clé change dès que le contenu change."""
+    assert content_key(b"abc") == content_key(b"abc")
+    assert content_key(b"abc") != content_key(b"abd")
+
+
+def test_disque_ecriture_atomique_et_relecture(tmp_path):
+    """Vérifie qu'une entrée n'est visible qu'une fois publiée, et qu'une écriture abandonnée ne laisse rien."""
+    store = DiskResultStore(tmp_path, 1000)
+    pending = store.writer("abcd")
+    pending.write(b"12")
+    assert store.open("abcd") is None
+    pending.write(b"34")
+    assert pending.commit() is True
+    with store.open("abcd") as f:
+        assert f.read() == b"1234"
+
+    abandoned = store.writer("ef01")
+    abandoned.write(b"xx")
+    abandoned.abort()
+    assert store.open("ef01") is None
+    assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == ["abcd"]
+    assert store.stats()["hits"] == 1
+
+def test_disque_eviction_par_atime(tmp_path):
+    """Vérifie que l'éviction supprime les entrées lues le moins récemment, et qu'une entrée trop grande est refusée."""
+    store = DiskResultStore(tmp_path, 1000)
+    for i, key in enumerate(("aa", "bb", "cc")):
+        store.put(key, b"x" * 40)
+        os.utime(store.path(key), (1000 + i, 1000 + i))
+    store.max_bytes = 100
+    # Relire "aa" la rend plus récente que "bb"
+    store.open("aa").close()
+
+    assert store.evict() == 80
+    assert store.open("bb") is None
+    assert store.open("aa") is not None and store.open("cc") is not None
+    assert store.stats()["evictions"] == 1
+    assert store.put("dd", b"x" * 101) is False
+    assert store.open("dd") is None
+
+
+def _run_concurrently(flights, fn, n_followers):
+    """Lance un appel meneur bloqué dans fn puis n_followers appels de même clé ; renvoie les résultats ou exceptions."""
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def blocked():
+        started.set()
+        release.wait(5)
+        return fn()
+
+    def call(target):
+        try:
+            results.append(flights.do("k", target))
+        except Exception as e:
+            results.append(e)
+
+    threads = [threading.Thread(target=call, args=(blocked,))]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=call, args=(fn,)) for _ in range(n_followers)]
+    for t in threads[1:]:
+        t.start()
+    deadline = time.monotonic() + 5
+    while flights.shared < n_followers and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+    return results
+
+def test_single_flight_partage_le_resultat():
+    """Vérifie que les appels simultanés de même clé n'exécutent la fonction qu'une fois."""
+    calls = []
+    flights = SingleFlight()
+    results = _run_concurrently(flights, lambda: calls.append(1) or "résultat", 3)
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [("résultat", False)] + [("résultat", True)] * 3
+    assert (flights.executed, flights.shared) == (1, 3)
+    # Une fois l'appel terminé, rien n'est gardé
+    assert flights.do("k", lambda: "nouveau") == ("nouveau", False)
+
+def test_single_flight_propage_l_erreur():
+    """Vérifie que l'exception du meneur est transmise à tous les appels en attente."""
+    def fail():
+        raise ValueError("boom")
+
+    results = _run_concurrently(SingleFlight(), fail, 2)
+    assert len(results) == 3
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    with pytest.raises(ValueError):
+        SingleFlight().do("k", fail)
+
+def test_maillages_bornes_en_octets():
+    """Vérifie que les maillages les moins récents sont évincés au-delà de la taille maximale, et une entrée trop grande aussi."""
+    store = MeshStore(10, max_bytes=100)
+    a, b = store.entry("a"), store.entry("b")
+    store.resize("a", a, 60)
+    store.resize("b", b, 30)
+    assert len(store) == 2
+
+    store.entry("a")
+    store.resize("b", b, 50)
+    assert store.entry("a") is a and len(store) == 1
+
+    store.resize("a", a, 150)
+    assert len(store) == 0
+    store.resize("a", a, 10)
+    assert len(store) == 0
+
+def test_verrou_par_cle(tmp_path):
+    """Vérifie que le verrou d'une clé ne bloque pas les autres clés, expire au-delà du délai et ne laisse pas de fichier."""
+    store = DiskResultStore(tmp_path, 1000)
+    held = store.lock("abc1")
+    other = store.lock("abc2", timeout=0.1)
+    with pytest.raises(TimeoutError):
+        store.lock("abc1", timeout=0.1)
+    other.release()
+    held.release()
+
+    again = store.lock("abc1", timeout=0.1)
+    again.release()
+    assert list((tmp_path / DiskResultStore.LOCKS).iterdir()) == []
@@ -1,10 +1,26 @@
 """Tests unitaires pour la conversion binaire PointSet et Triangles."""
 import struct
+import sys
+import zlib
+from array import array
 from unittest.mock import Mock
 
 import pytest
 
-from TP.Code.serializers import bytes_to_pointset, triangles_to_bytes
+from TP.Code.serializers import (
+    PointSet,
+    PointSetParser,
+    bytes_to_batch,
+    bytes_to_delta,
+    bytes_to_pointset,
+    compact_to_triangles,
+    delta_to_bytes,
+    encoded_size,
+    iter_batch_bytes,
+    iter_triangles_bytes,
+    triangles_to_bytes,
+    triangles_to_compact,
+)
 
 # tester si le nombre de point correspond au nombre de point en bytes
 
@@ -99,4 +115,159 @@ def test_triangles_to_bytes_empty():
     triangles.n_triangles.return_value = 0
     triangles.get_triangles.return_value = []
     with pytest.raises(Exception, match="No triangles to serialize"):
-        triangles_to_bytes(triangles.n_triangles(), triangles.get_triangles(),point_set.n_points(),point_set.get_points())
\ No newline at end of file
+        triangles_to_bytes(triangles.n_triangles(), triangles.get_triangles(),point_set.n_points(),point_set.get_points())
+
+def test_bytes_to_pointset_se_comporte_comme_une_liste():
+    """Vérifie que le PointSet renvoyé s'utilise comme une liste de tuples (x, y)."""
+    point_bytes = struct.pack('<I', 3) + struct.pack('<dddddd', 1.0, 2.0, -3.5, 0.25, 10.0, -1.0)
+    points = bytes_to_pointset(point_bytes)["points"]
+
+    assert isinstance(points, PointSet)
+    assert len(points) == 3
+    assert points[1] == (-3.5, 0.25)
+    assert points[-1] == (10.0, -1.0)
+    assert points[0:2] == [(1.0, 2.0), (-3.5, 0.25)]
+    assert list(points) == [(1.0, 2.0), (-3.5, 0.25), (10.0, -1.0)]
+    assert list(points.xs) == [1.0, -3.5, 10.0]
+    assert list(points.ys) == [2.0, 0.25, -1.0]
+
+
+@pytest.mark.skipif(sys.byteorder != "little", reason="copie nécessaire sur une machine gros-boutiste")
+def test_bytes_to_pointset_sans_copie():
+    """Vérifie que les coordonnées sont lues directement dans le tampon reçu."""
+    buffer = bytearray(struct.pack('<I', 1) + struct.pack('<dd', 1.0, 2.0))
+    points = bytes_to_pointset(buffer)["points"]
+
+    struct.pack_into('<d', buffer, 4, 42.0)
+    assert points[0] == (42.0, 2.0)
+
+
+def test_triangles_to_bytes_donnees_deja_aplaties():
+    """Vérifie que PointSet et array('I') aplatis donnent le même binaire que des listes de tuples."""
+    points = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0)]
+    triangles = [(0, 1, 2), (1, 2, 3)]
+    expected = triangles_to_bytes(2, triangles, 4, points)
+
+    point_set = bytes_to_pointset(bytes(expected[:4 + 4 * 16]))["points"]
+    flat_triangles = array('I', [0, 1, 2, 1, 2, 3])
+    assert triangles_to_bytes(2, flat_triangles, 4, point_set) == expected
+
+
+def test_triangles_to_bytes_nombre_incoherent():
+    """Vérifie qu'un nombre de triangles annoncé différent du contenu est refusé."""
+    with pytest.raises(ValueError, match="Item count does not match the header"):
+        triangles_to_bytes(2, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+
+def test_iter_triangles_bytes_identique_a_triangles_to_bytes():
+    """Vérifie que la sérialisation par morceaux reconstitue exactement triangles_to_bytes."""
+    points = [(float(i), float(i * i)) for i in range(50)]
+    triangles = [(i, i + 1, i + 2) for i in range(48)]
+    expected = triangles_to_bytes(48, triangles, 50, points)
+
+    chunks = list(iter_triangles_bytes(48, triangles, 50, points, chunk_size=100))
+    assert len(chunks) > 4
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert b"".join(chunks) == expected
+    assert encoded_size(48, 50) == len(expected)
+
+
+def test_iter_triangles_bytes_erreur_immediate():
+    """Vérifie que les erreurs sont levées dès l'appel, avant le premier morceau."""
+    with pytest.raises(ValueError, match="No triangles to serialize"):
+        iter_triangles_bytes(0, [], 0, [])
+    with pytest.raises(ValueError, match="Item count does not match the header"):
+        iter_triangles_bytes(2, [(0, 1, 2)], 3, [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+
+
+def test_lot_aller_retour():
+    """Vérifie que la réponse de lot se relit à l'identique et qu'une réponse tronquée est refusée."""
+    items = [(200, b"\x01\x02\x03"), (404, b'{"error": "PointSet not found"}'), (200, b"")]
+    data = b"".join(iter_batch_bytes(len(items), items))
+    assert bytes_to_batch(data) == items
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        bytes_to_batch(data[:-5])
+
+
+def test_delta_aller_retour():
+    """Vérifie que le delta d'une insertion se relit à l'identique, y compris vide."""
+    removed = [(0, 1, 2)]
+    added = [(0, 1, 3), (1, 2, 3), (0, 2, 3)]
+    data = delta_to_bytes(removed, added)
+    assert len(data) == 4 + 12 + 4 + 36
+    assert bytes_to_delta(data) == (removed, added)
+    assert bytes_to_delta(delta_to_bytes([], [])) == ([], [])
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        bytes_to_delta(data[:-1])
+
+
+@pytest.mark.parametrize("n_pts, compress", [(5, False), (5, True), (70_000, False), (70_000, True)])
+def test_compact_aller_retour(n_pts, compress):
+    """Vérifie la relecture du format compact (indices sur 16 ou 32 bits, compressé ou non), à rotation et ordre près."""
+    triangles = [(4, 0, 1), (2, 3, n_pts - 1), (1, 4, 2), (3, 2, 0)]
+    data = triangles_to_compact(len(triangles), triangles, n_pts, compress)
+    decoded = compact_to_triangles(data)
+    assert decoded["nbr_point"] == n_pts
+    assert decoded["triangles"] == [(0, 1, 4), (0, 3, 2), (1, 4, 2), (2, 3, n_pts - 1)]
+    if not compress:
+        assert len(data) == 9 + 12 * (2 if n_pts <= 65536 else 4)
+    flat = array('I', [c for t in triangles for c in t])
+    assert compact_to_triangles(triangles_to_compact(len(triangles), flat, n_pts, compress)) == decoded
+
+
+def test_compact_erreurs():
+    """Vérifie que le format compact refuse les index hors bornes et les données tronquées ou inconnues."""
+    with pytest.raises(ValueError, match="No triangles to serialize"):
+        triangles_to_compact(0, [], 3)
+    with pytest.raises(ValueError, match="out of range"):
+        triangles_to_compact(1, [(0, 1, 3)], 3)
+    data = triangles_to_compact(1, [(0, 1, 2)], 3)
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        compact_to_triangles(data[:-1])
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        compact_to_triangles(data[:5])
+    with pytest.raises(ValueError, match="Unknown compact format flags"):
+        compact_to_triangles(b"\x80" + data[1:])
+    with pytest.raises(ValueError, match="Invalid compressed payload"):
+        compact_to_triangles(b"\x01" + data[1:])
+    zipped = triangles_to_compact(1, [(0, 1, 2)], 3, compress=True)
+    with pytest.raises(ValueError, match="Unexpected bytes after the compressed triangles"):
+        compact_to_triangles(zipped + b"\x00")
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        compact_to_triangles(zipped[:-1])
+
+
+@pytest.mark.parametrize("n_triangles", [0, 1])
+def test_compact_compresse_plus_long_que_annonce(n_triangles):
+    """Vérifie qu'un flux zlib qui produit plus que les triangles annoncés est refusé, même sans triangle."""
+    header = struct.pack('<BII', 1, 3, n_triangles)
+    with pytest.raises(ValueError, match="Unexpected bytes after the compressed triangles"):
+        compact_to_triangles(header + zlib.compress(bytes(6 * n_triangles + 1024 * 1024)))
+
+
+@pytest.mark.parametrize("total_size", [None, 4 + 3 * 16])
+def test_pointset_parser_incremental(total_size):
+    """Vérifie que le décodage octet par octet donne le même résultat que bytes_to_pointset, octets en trop ignorés."""
+    data = struct.pack('<I', 3) + struct.pack('<6d', 1.0, 2.0, -3.5, 0.25, 10.0, -1.0)
+    parser = PointSetParser(total_size)
+    for i in range(len(data)):
+        parser.feed(data[i:i + 1])
+    parser.feed(b"\x00" * 5)
+    assert parser.close() == bytes_to_pointset(data)
+    assert bytes(parser.data) == data
+
+
+def test_pointset_parser_refuse_les_flux_tronques():
+    """Vérifie qu'un flux tronqué est refusé à la fin, et dès l'en-tête si la taille annoncée ne suffit pas."""
+    data = struct.pack('<I', 3) + struct.pack('<6d', 1.0, 2.0, -3.5, 0.25, 10.0, -1.0)
+    parser = PointSetParser()
+    parser.feed(data[:-1])
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        parser.close()
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        PointSetParser().close()
+
+    early = PointSetParser(total_size=len(data) - 1)
+    early.feed(data[:2])
+    with pytest.raises(ValueError, match="Insufficient bytes"):
+        early.feed(data[2:6])
@@ -1,10 +1,22 @@
 """Tests unitaires pour la triangulation."""
 
+import random
+import sys
 from unittest.mock import Mock
 
 import pytest
 
-from TP.Code.triangulation import triangulate
+from TP.Code.triangulation import (
+    Triangulation,
+    _BowyerWatson,
+    _brio_order,
+    _circumcircle_contains,
+    _incircle_exact,
+    _incircle_xy,
+    _orient_exact,
+    _orientation_xy,
+    triangulate,
+)
 
 
 def test_cas_nominal():
@@ -127,3 +139,173 @@ def test_cas_point_colineaires():
 
     with pytest.raises(Exception, match="All points are colinear"):
         triangulate(point_set.get_points())
+
+def test_propriete_delaunay_points_aleatoires():
+    """Test que chaque cercle circonscrit est vide sur un nuage de points aléatoires."""
+    rnd = random.Random(3)
+    points = [(rnd.random() * 100.0, rnd.random() * 100.0) for _ in range(200)]
+    t = triangulate(points)
+
+    used = set()
+    for a, b, c in t:
+        used.update((a, b, c))
+        for i, p in enumerate(points):
+            if i not in (a, b, c):
+                assert not _circumcircle_contains((a, b, c), p, points)
+    assert used == set(range(len(points)))
+
+def test_diviser_pour_regner_identique_a_bowyer_watson():
+    """Test que les deux moteurs produisent les mêmes triangles sur des points en position générale."""
+    rnd = random.Random(4)
+    points = [(rnd.random() * 100.0, rnd.random() * 100.0) for _ in range(300)]
+    t_bw = triangulate(points, method="bowyer-watson")
+    t_dc = triangulate(points, method="divide-and-conquer")
+    assert set(t_bw) == set(t_dc)
+    assert all(tri == tuple(sorted(tri)) for tri in t_dc)
+
+@pytest.mark.parametrize("points, message", [
+    ([(0, 0), (1, 0)], "Insufficient points to form a triangle"),
+    ([(0, 0), (1, 0), (0, 1), (0, 0)], "Duplicate points found"),
+    ([(0, 0), (1, 1), (2, 2), (3, 3)], "All points are colinear"),
+])
+def test_diviser_pour_regner_validation(points, message):
+    """Test que le moteur diviser pour régner applique les mêmes validations."""
+    with pytest.raises(ValueError, match=message):
+        triangulate(points, method="divide-and-conquer")
+
+def test_methode_inconnue():
+    """Test qu'une méthode de triangulation inconnue est refusée."""
+    with pytest.raises(ValueError, match="Unknown triangulation method"):
+        triangulate([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)], method="magic")
+
+def test_ordre_brio_conserve_les_indices():
+    """Test que l'ordre d'insertion BRIO renvoie les mêmes triangles, avec les indices d'origine."""
+    rnd = random.Random(5)
+    points = [(rnd.random() * 100.0, rnd.random() * 100.0) for _ in range(500)]
+    t_input = triangulate(points, method="bowyer-watson")
+    t_brio = triangulate(points, method="bowyer-watson", insertion_order="brio")
+    assert set(t_brio) == set(t_input)
+
+@pytest.mark.parametrize("workers, expected", [(1, "bowyer-watson"), (2, "divide-and-conquer")])
+def test_mode_auto(monkeypatch, workers, expected):
+    """Test que "auto" prend Bowyer-Watson, en ordre BRIO au-delà du seuil, et diviser pour régner seulement en parallèle."""
+    import TP.Code.triangulation as triangulation
+    bowyer_watson, divide_and_conquer = Mock(return_value=[]), Mock(return_value=[])
+    monkeypatch.setitem(triangulation._METHODS, "bowyer-watson", bowyer_watson)
+    monkeypatch.setattr(triangulation, "_divide_and_conquer", divide_and_conquer)
+    monkeypatch.setattr(triangulation, "AUTO_BRIO_THRESHOLD", 4)
+    monkeypatch.setattr(triangulation, "AUTO_DIVIDE_AND_CONQUER_THRESHOLD", 5)
+    points = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0), (0.3, 0.6)]
+
+    triangulate(points[:3], workers=workers)
+    bowyer_watson.assert_called_with(points[:3], "input")
+    triangulate(points[:4], workers=workers)
+    bowyer_watson.assert_called_with(points[:4], "brio")
+    triangulate(points, workers=workers)
+    if expected == "divide-and-conquer":
+        divide_and_conquer.assert_called_once_with(points, "input", workers)
+    else:
+        bowyer_watson.assert_called_with(points, "brio")
+        divide_and_conquer.assert_not_called()
+
+def test_ordre_brio_est_une_permutation():
+    """Test que l'ordre BRIO visite chaque point exactement une fois."""
+    rnd = random.Random(6)
+    points = [(rnd.random(), rnd.random()) for _ in range(1000)]
+    assert sorted(_brio_order(points)) == list(range(len(points)))
+
+def test_stockage_compact_des_triangles():
+    """Test que le stockage par tableaux réutilise les emplacements et coûte moins qu'un tuple par triangle."""
+    rnd = random.Random(7)
+    points = [(rnd.random(), rnd.random()) for _ in range(1000)]
+    mesh = _BowyerWatson(points, range(len(points)))
+
+    store = mesh.store
+    slots = len(store.vertices) // 3
+    assert slots == len(store) + len(store.free)
+    assert slots < 1.1 * len(store)
+    assert store.nbytes() / slots < sys.getsizeof((0, 1, 2))
+
+def test_insertion_incrementale_equivaut_a_une_triangulation_complete():
+    """Test que des points ajoutés après coup donnent le même maillage qu'une triangulation depuis zéro."""
+    rnd = random.Random(8)
+    points = [(rnd.random() * 100.0, rnd.random() * 100.0) for _ in range(500)]
+    new_points = [(rnd.random() * 100.0, rnd.random() * 100.0) for _ in range(20)]
+    mesh = Triangulation(points)
+    before = set(mesh.triangles())
+
+    removed, added = mesh.insert(new_points)
+
+    assert len(mesh) == 520
+    assert mesh.points == points + new_points
+    assert set(mesh.triangles()) == set(triangulate(points + new_points, method="bowyer-watson"))
+    # Le delta permet de passer de l'ancien maillage au nouveau
+    assert set(removed) <= before
+    assert (before - set(removed)) | set(added) == set(mesh.triangles())
+
+@pytest.mark.parametrize("new_points, message", [
+    ([(0.5, 0.5), (1.0, 0.0)], "Duplicate points found"),
+    ([(0.5, 0.5), (0.5, 0.5)], "Duplicate points found"),
+])
+def test_insertion_refusee_laisse_le_maillage_inchange(new_points, message):
+    """Test qu'un lot de points invalide est refusé sans modifier le maillage."""
+    mesh = Triangulation([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0)])
+    before = mesh.triangles()
+    with pytest.raises(ValueError, match=message):
+        mesh.insert(new_points)
+    assert mesh.triangles() == before
+    assert len(mesh) == 4
+
+@pytest.mark.parametrize("n, workers", [(3, 2), (7, 4), (500, 2), (500, 3), (2000, 8)])
+def test_diviser_pour_regner_parallele_identique(n, workers):
+    """Test que la triangulation par bandes en parallèle donne les mêmes triangles qu'en série."""
+    rnd = random.Random(n)
+    points = [(rnd.random() * 100.0, rnd.random() * 100.0) for _ in range(n)]
+    serial = triangulate(points, method="divide-and-conquer")
+    parallel = triangulate(points, method="divide-and-conquer", workers=workers)
+    assert sorted(parallel) == sorted(serial)
+
+def test_nombre_de_processus_invalide():
+    """Test qu'un nombre de processus nul est refusé."""
+    with pytest.raises(ValueError, match="Invalid number of workers"):
+        triangulate([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)], workers=0)
+
+def test_orientation_robuste_pres_de_l_alignement():
+    """Test que l'orientation filtrée donne le signe exact sur des points presque alignés."""
+    eps = 2.0 ** -53
+    for i in range(32):
+        for j in range(32):
+            x, y = 0.5 + i * eps, 0.5 + j * eps
+            expected = _orient_exact(x, y, 12.0, 12.0, 24.0, 24.0)
+            result = _orientation_xy(x, y, 12.0, 12.0, 24.0, 24.0)
+            assert (result > 0) - (result < 0) == expected
+
+def test_cercle_robuste_points_presque_cocycliques():
+    """Test que le test du cercle filtré donne le signe exact près du cercle unité."""
+    rnd = random.Random(9)
+    a, b, c = (1.0, 0.0), (0.0, 1.0), (-1.0, 0.0)
+    for _ in range(200):
+        d = (0.0, -1.0 + rnd.choice((-1, 0, 1)) * rnd.randint(0, 4) * 2.0 ** -53)
+        result = _incircle_xy(*a, *b, *c, *d)
+        assert (result > 0) - (result < 0) == _incircle_exact(*a, *b, *c, *d)
+
+@pytest.mark.parametrize("method", ["bowyer-watson", "divide-and-conquer"])
+@pytest.mark.parametrize("offset, scale", [(0.0, 1.0), (1e9, 1.0), (0.0, 1e-9)])
+def test_grille_cocyclique(method, offset, scale):
+    """Test qu'une grille (nombreux points cocycliques) donne une triangulation complète et de Delaunay."""
+    points = [(offset + x * scale, offset + y * scale) for x in range(8) for y in range(8)]
+    t = triangulate(points, method=method)
+    # 2n - 2 - h triangles pour n points dont h sur le bord de l'enveloppe
+    assert len(t) == 2 * 64 - 2 - 28
+    for a, b, c in t:
+        for i, p in enumerate(points):
+            if i not in (a, b, c):
+                assert not _circumcircle_contains((a, b, c), p, points)
+
+def test_insertion_hors_de_l_enveloppe():
+    """Test que des points ajoutés loin de l'enveloppe initiale sont acceptés."""
+    mesh = Triangulation([(0.0, 0.0), (1.0, 0.0), (0.0, 1.0)])
+    mesh.insert([(1e12, 0.0), (2.0, 0.0), (-5.0, -5.0)])
+    points = mesh.points
+    assert set(mesh.triangles()) == set(triangulate(points, method="bowyer-watson"))
+    assert len(mesh.triangles()) == 2 * 6 - 2 - 3
@@ -0,0 +1,57 @@
+"""Tests du client PointSetManager contre un faux PointSetManager local."""
+
+import pytest
+import requests
+
+from TP.Code.upstream import PointSetClient
+
+
+def test_connexions_reutilisees(pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie que plusieurs requêtes successives réutilisent la même connexion."""
+    pointset_manager_server.routes["42"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    client = PointSetClient(pointset_manager_server.url)
+    for _ in range(5):
+        response = client.get_pointset("42")
+        assert response.status_code == 200
+        assert response.content == sample_triangle_pointset_bytes
+    client.close()
+
+    assert pointset_manager_server.connections == 1
+
+def test_reprise_apres_erreur_temporaire(pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie qu'une réponse 503 du PointSetManager est retentée."""
+    pointset_manager_server.routes["42"] = [(503, b"", 0.0), (200, sample_triangle_pointset_bytes, 0.0)]
+    client = PointSetClient(pointset_manager_server.url, retries=2, backoff_factor=0.0)
+
+    response = client.get_pointset("42")
+    assert response.status_code == 200
+    assert pointset_manager_server.requests == ["42", "42"]
+
+def test_404_non_retente(pointset_manager_server):
+    """Vérifie qu'un PointSet absent n'est demandé qu'une fois."""
+    client = PointSetClient(pointset_manager_server.url, retries=2, backoff_factor=0.0)
+    assert client.get_pointset("absent").status_code == 404
+    assert pointset_manager_server.requests == ["absent"]
+
+def test_delai_de_lecture_depasse(pointset_manager_server, sample_triangle_pointset_bytes):
+    """Vérifie qu'un PointSetManager bloqué provoque une erreur au lieu d'attendre indéfiniment."""
+    pointset_manager_server.routes["lent"] = [(200, sample_triangle_pointset_bytes, 0.5)]
+    client = PointSetClient(pointset_manager_server.url, read_timeout=0.1, retries=0)
+    with pytest.raises(requests.exceptions.RequestException):
+        client.get_pointset("lent")
+
+def test_endpoint_avec_faux_pointset_manager(pointset_manager_server, sample_triangle_pointset_bytes, flask_test_client, monkeypatch):
+    """Vérifie l'endpoint de bout en bout contre le faux PointSetManager."""
+    pointset_manager_server.routes["7"] = [(200, sample_triangle_pointset_bytes, 0.0)]
+    monkeypatch.setattr("TP.Code.app.pointset_client", PointSetClient(pointset_manager_server.url))
+
+    resp = flask_test_client.get("/triangulate/7")
+    assert resp.status_code == 200
+    assert len(resp.data) == 4 + 3 * 16 + 4 + 12
+    assert flask_test_client.get("/triangulate/absent").status_code == 404
+
+def test_identifiant_encode(pointset_manager_server):
+    """Vérifie que l'identifiant est envoyé comme un seul segment de chemin, ? et espaces compris."""
+    client = PointSetClient(pointset_manager_server.url, retries=0)
+    assert client.get_pointset("a?b c").status_code == 404
+    assert pointset_manager_server.requests == ["a%3Fb%20c"]